@@ -0,0 +1,91 @@
+"""
+Per-call overhead of ScriptCommand dispatch.
+
+Compares the old `run` (inspect.signature walked on every call) with the
+precompiled CallPlan, both for `run` (parsed Namespace) and `run_cli`
+(argparse + run).
+
+  python benchmarks/bench_dispatch.py [--number N]
+"""
+import sys
+import timeit
+import inspect
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from zzz.core.context.command import ScriptCommand
+
+
+def legacy_run(func, args):
+  # ScriptCommand.run before the call plan, kept here as the reference
+  arg_dict = args if isinstance(args, dict) else vars(args)
+
+  sig = inspect.signature(func)
+  positional = []
+  keywords = {}
+  varargs = []
+  extra_kwargs = {}
+
+  for name, param in sig.parameters.items():
+    if param.kind == inspect.Parameter.VAR_POSITIONAL:
+      varargs = arg_dict.get(name, [])
+    elif param.kind == inspect.Parameter.VAR_KEYWORD:
+      for k, v in arg_dict.items():
+        if k not in sig.parameters:
+          extra_kwargs[k] = v
+    else:
+      if name in arg_dict:
+        if param.default is inspect._empty:
+          positional.append(arg_dict[name])
+        else:
+          keywords[name] = arg_dict[name]
+
+  return func(*positional, *varargs, **keywords, **extra_kwargs)
+
+
+def target(host, port: int, *paths, user: str = "root", retries: int = 3, **extra):
+  return host
+
+
+def echo(text, count: int = 1, *rest, **kw):
+  return text, count, rest
+
+
+def run(number: int = 100_000):
+  command = ScriptCommand("target", target)
+  argv = ["example.org", "22", "a", "b", "--user", "admin", "--retries", "5"]
+  namespace = command.argparser.parse_args(argv)
+
+  # sanity, both paths must bind the same way
+  assert legacy_run(target, namespace) == command.run(namespace)
+  # a defaulted parameter before *args goes positionally (legacy binding raised TypeError)
+  assert ScriptCommand("echo", echo).run_cli(["a", "b", "c"]) == ("a", 1, ("b", "c"))
+  assert ScriptCommand("echo", echo).run_cli(["a", "b", "--count", "2"]) == ("a", 2, ("b",))
+
+  def per_call_us(stmt, n):
+    return min(timeit.repeat(stmt, number=n, repeat=5)) / n * 1e6
+
+  return {
+    "run_legacy_us": per_call_us(lambda: legacy_run(target, namespace), number),
+    "run_plan_us": per_call_us(lambda: command.run(namespace), number),
+    "run_cli_legacy_us": per_call_us(lambda: legacy_run(target, command.argparser.parse_args(argv)), number // 10),
+    "run_cli_plan_us": per_call_us(lambda: command.run_cli(argv), number // 10),
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description="ScriptCommand dispatch overhead")
+  parser.add_argument("--number", type=int, default=100_000)
+  args = parser.parse_args()
+
+  result = run(args.number)
+  print(f"run      legacy: {result['run_legacy_us']:8.2f} us/call  plan: {result['run_plan_us']:8.2f} us/call "
+        f"({result['run_legacy_us'] / result['run_plan_us']:.1f}x)")
+  print(f"run_cli  legacy: {result['run_cli_legacy_us']:8.2f} us/call  plan: {result['run_cli_plan_us']:8.2f} us/call")
+
+
+if __name__ == "__main__":
+  main()
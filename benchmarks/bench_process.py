@@ -0,0 +1,58 @@
+"""
+sh() hot paths: process spawn rate and large output throughput.
+
+  - spawn: `sh("true").pipe()` calls per second (fork / exec / wait)
+  - pipe: MiB/s read through `pipe()` (communicate, everything in memory)
+  - lines: lines/s through `lines()` (reader threads + bounded queue)
+
+  python benchmarks/bench_process.py [--calls N] [--mib N] [--lines N]
+"""
+import sys
+import time
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from zzz.modules.process import sh
+
+
+def run(calls: int = 200, mib: int = 64, lines: int = 500_000):
+  start = time.perf_counter()
+  for _ in range(calls):
+    sh("true").pipe()
+  spawn = calls / (time.perf_counter() - start)
+
+  start = time.perf_counter()
+  output = sh(f"head -c {mib * 1024 * 1024} /dev/zero").pipe()
+  elapsed = time.perf_counter() - start
+  assert len(output._stdout) == mib * 1024 * 1024
+
+  start = time.perf_counter()
+  count = sum(1 for _ in sh(f"seq 1 {lines}").lines())
+  lines_elapsed = time.perf_counter() - start
+  assert count == lines
+
+  return {
+    "spawn_calls_s": spawn,
+    "pipe_mib_s": mib / elapsed,
+    "lines_s": lines / lines_elapsed,
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description="sh() spawn rate and output throughput")
+  parser.add_argument("--calls", type=int, default=200)
+  parser.add_argument("--mib", type=int, default=64, help="size of the pipe() output")
+  parser.add_argument("--lines", type=int, default=500_000, help="lines read through lines()")
+  args = parser.parse_args()
+
+  result = run(args.calls, args.mib, args.lines)
+  print(f"spawn : {result['spawn_calls_s']:10.0f} calls/s")
+  print(f"pipe  : {result['pipe_mib_s']:10.0f} MiB/s")
+  print(f"lines : {result['lines_s']:10.0f} lines/s")
+
+
+if __name__ == "__main__":
+  main()
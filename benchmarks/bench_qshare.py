@@ -0,0 +1,90 @@
+"""
+qshare directory listings of a big directory: the cold scan (scandir + stat), a cached lookup and the
+render of one page, on a temporary tree of N empty files.
+
+  python benchmarks/bench_qshare.py [--files N] [--limit N]
+
+scripts/qshare.py imports fastapi / uvicorn, they must be installed.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _qshare():
+  sys.path.insert(0, str(ROOT / "scripts"))
+  import qshare
+  return qshare
+
+
+def make_tree(directory: str, files: int) -> None:
+  for i in range(files):
+    os.close(os.open(os.path.join(directory, f"file-{i:07d}.txt"), os.O_CREAT | os.O_WRONLY, 0o644))
+  for i in range(max(1, files // 1000)):
+    os.mkdir(os.path.join(directory, f"dir-{i:05d}"))
+
+
+def run(files: int = 100_000, limit: int = 500):
+  qshare = _qshare()
+  directory = tempfile.mkdtemp(prefix="zzz-bench-qshare-")
+  try:
+    make_tree(directory, files)
+    target = Path(directory)
+    qshare.SHARED_DIR = target
+    qshare._listings.clear()
+
+    start = time.perf_counter()
+    entries = qshare.scan_directory(target)
+    scan = time.perf_counter() - start
+
+    qshare.get_listing(target)  # fills the cache
+    start = time.perf_counter()
+    cached = qshare.get_listing(target)
+    hit = time.perf_counter() - start
+    assert cached == entries
+
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in qshare.render_listing("", target, entries, 0, limit))
+    render = time.perf_counter() - start
+
+    # a page in the middle of the listing
+    start = time.perf_counter()
+    for _ in qshare.render_listing("", target, entries, len(entries) // 2, limit):
+      pass
+    render_mid = time.perf_counter() - start
+  finally:
+    qshare._listings.clear()
+    shutil.rmtree(directory, ignore_errors=True)
+
+  return {
+    "scan_ms": scan * 1000,
+    "scan_entries_s": len(entries) / scan,
+    "cached_listing_us": hit * 1e6,
+    "render_page_ms": render * 1000,
+    "render_page_mid_ms": render_mid * 1000,
+    "page_kb": size / 1024,
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description="qshare directory listing speed")
+  parser.add_argument("--files", type=int, default=100_000)
+  parser.add_argument("--limit", type=int, default=500, help="entries per page")
+  args = parser.parse_args()
+
+  result = run(args.files, args.limit)
+  print(f"scan          : {result['scan_ms']:8.1f} ms ({result['scan_entries_s']:10.0f} entries/s)")
+  print(f"cached listing: {result['cached_listing_us']:8.1f} us")
+  print(f"render page   : {result['render_page_ms']:8.2f} ms (middle {result['render_page_mid_ms']:.2f} ms, {result['page_kb']:.0f} KB)")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,122 @@
+"""
+Startup time and memory of large command registries.
+
+Each size writes a script with N generated commands to a temporary
+directory and runs it as a real file in a fresh interpreter (so the
+manifest in ZZZ_HOME is looked up and written like for a user's script):
+dispatch one command, show the cli help (`-h`), or open the interactive
+runner and run one command in it. Every mode runs twice on an empty
+ZZZ_HOME, cold (no manifest yet) then warm. `--eager` forces every parser
+to be built up front, which is what registration used to cost.
+
+  python benchmarks/bench_registry.py [--sizes 1000 10000] [--eager]
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCRIPT = """
+import io
+import sys
+import time
+import json
+import resource
+import contextlib
+
+start = time.perf_counter()
+
+from zzz import ZScript, Arg
+from zzz.core.runner.cli import ZScriptRunnerCli
+
+script = ZScript("bench")
+
+def make(i):
+  def command(host, port: int = 22, verbose: Arg("-v", "--verbose", action="store_true") = False, *extra):
+    return i
+  return command
+
+for i in range({size}):
+  script.on(f"host-{{i}}", short=f"inventory host {{i}}")(make(i))
+
+if {eager}:
+  for _, command in script.commands.items():
+    command.argparser
+
+registered = time.perf_counter()
+
+with contextlib.redirect_stdout(io.StringIO()):
+  if sys.argv[1] == "--bench-interactive":
+    from zzz.core.runner.interactive import ZScriptRunner
+    ZScriptRunner(script).onecmd_plus_hooks(" ".join(sys.argv[2:]))
+  else:
+    ZScriptRunnerCli(script).run()
+
+done = time.perf_counter()
+print(json.dumps({{
+  "register_ms": (registered - start) * 1000,
+  "total_ms": (done - start) * 1000,
+  "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+"""
+
+# mode - script argv
+MODES = {
+  "run": ["host-0", "example.org", "--port", "2222", "-v"],
+  "help": ["-h"],
+  "interactive": ["--bench-interactive", "host-0", "example.org", "--port", "2222", "-v"],
+}
+
+
+def measure(script: str, home: str, mode: str = "run"):
+  env = dict(
+    os.environ,
+    ZZZ_HOME=home,
+    PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+  )
+  proc = subprocess.run(
+    [sys.executable, script, *MODES[mode]],
+    capture_output=True, text=True, env=env, check=True
+  )
+  # atexit of AdvConsole may write a cursor escape after the result
+  line = next(line for line in proc.stdout.splitlines() if line.startswith("{"))
+  return json.loads(line)
+
+
+def run(sizes=(1000, 10000), eager: bool = False):
+  results = {}
+  directory = tempfile.mkdtemp(prefix="zzz-bench-registry-")
+  try:
+    for size in sizes:
+      script = os.path.join(directory, f"registry_{size}.py")
+      Path(script).write_text(SCRIPT.format(size=size, eager=eager))
+      for mode in MODES:
+        home = os.path.join(directory, f"home-{size}-{mode}")
+        results[f"{size}_{mode}_cold"] = measure(script, home, mode)
+        results[f"{size}_{mode}_warm"] = measure(script, home, mode)
+  finally:
+    shutil.rmtree(directory, ignore_errors=True)
+  return results
+
+
+def main():
+  parser = argparse.ArgumentParser(description="zzz registry startup / RSS benchmark")
+  parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+  parser.add_argument("--eager", action="store_true", help="build every parser at registration (old behaviour)")
+  args = parser.parse_args()
+
+  print(f"{'commands':>9} {'mode':>11} {'manifest':>8} {'register ms':>12} {'total ms':>10} {'rss MiB':>8}")
+  for key, result in run(args.sizes, args.eager).items():
+    size, mode, state = key.split("_")
+    print(f"{size:>9} {mode:>11} {state:>8} {result['register_ms']:12.1f} {result['total_ms']:10.1f} {result['rss_kb'] / 1024:8.1f}")
+
+
+if __name__ == "__main__":
+  main()
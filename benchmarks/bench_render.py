@@ -0,0 +1,67 @@
+"""
+AdvConsole rendering of large datasets to a non-TTY sink (pipes, files, CI).
+
+print_table / print_list (and stream_table's plain output) render into an in-memory file, so only rich's
+layout and rendering are measured, not the terminal.
+
+  python benchmarks/bench_render.py [--rows N] [--items N]
+"""
+import io
+import sys
+import time
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from zzz.modules.console import AdvConsole
+
+
+def _console():
+  console = AdvConsole()
+  console.file = io.StringIO()  # not a tty: no colors, fixed width
+  return console
+
+
+def run(rows: int = 10_000, items: int = 10_000):
+  console = _console()
+  data = [(i, f"host-{i}.example.org", i * 7 % 65536, "up" if i % 3 else "down") for i in range(rows)]
+  start = time.perf_counter()
+  console.print_table(["ID", "Host", "Port", "State"], data, title="Hosts")
+  table = time.perf_counter() - start
+
+  console = _console()
+  names = [f"file-{i}.txt" for i in range(items)]
+  start = time.perf_counter()
+  console.print_list(names, title="Files")
+  listing = time.perf_counter() - start
+
+  console = _console()
+  start = time.perf_counter()
+  console.stream_table(["ID", "Host", "Port", "State"], iter(data), title="Hosts", pager=False)
+  stream = time.perf_counter() - start
+
+  return {
+    "stream_table_rows_s": rows / stream,
+    "table_rows_s": rows / table,
+    "table_ms": table * 1000,
+    "list_items_s": items / listing,
+    "list_ms": listing * 1000,
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description="print_table / print_list render speed")
+  parser.add_argument("--rows", type=int, default=10_000)
+  parser.add_argument("--items", type=int, default=10_000)
+  args = parser.parse_args()
+
+  result = run(args.rows, args.items)
+  print(f"print_table: {result['table_ms']:8.1f} ms ({result['table_rows_s']:8.0f} rows/s)")
+  print(f"print_list : {result['list_ms']:8.1f} ms ({result['list_items_s']:8.0f} items/s)")
+  print(f"stream_table (plain): {result['stream_table_rows_s']:8.0f} rows/s")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,49 @@
+"""
+Calls per second of tiny commands: ProcessBuilder (fresh /bin/sh per call)
+against a persistent ShellSession.
+
+  python benchmarks/bench_shell_session.py [--calls N]
+"""
+import sys
+import time
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from zzz.modules.process import sh
+from zzz.modules.session import ShellSession
+
+
+def calls_per_second(func, calls: int) -> float:
+  start = time.perf_counter()
+  for _ in range(calls):
+    func()
+  return calls / (time.perf_counter() - start)
+
+
+def run(calls: int = 500, cmd: str = "echo hello"):
+  with ShellSession() as session:
+    # both must agree on the output
+    assert session.run(cmd).output() == sh(cmd).pipe().output()
+    return {
+      "process_builder_calls_s": calls_per_second(lambda: sh(cmd).pipe(), calls),
+      "session_calls_s": calls_per_second(lambda: session.run(cmd), calls),
+    }
+
+
+def main():
+  parser = argparse.ArgumentParser(description="sh() vs ShellSession throughput")
+  parser.add_argument("--calls", type=int, default=500)
+  parser.add_argument("--cmd", default="echo hello")
+  args = parser.parse_args()
+
+  result = run(args.calls, args.cmd)
+  print(f"ProcessBuilder: {result['process_builder_calls_s']:10.0f} calls/s")
+  print(f"ShellSession  : {result['session_calls_s']:10.0f} calls/s "
+        f"({result['session_calls_s'] / result['process_builder_calls_s']:.1f}x)")
+
+
+if __name__ == "__main__":
+  main()
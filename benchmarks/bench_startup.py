@@ -0,0 +1,120 @@
+"""
+Startup regression check for the cli fast path.
+
+Runs `python -X importtime` on what `run_script_cli` needs (import zzz,
+build a ZScript, register and dispatch a command) in a fresh interpreter
+and fails when
+
+  - a heavy dependency (cmd2, rich, pydantic) gets imported, or
+  - the import time of zzz's own modules goes over the budget.
+
+Startup budget: STARTUP_BUDGET_MS (best of --runs), only stdlib modules
+pulled in by zzz are counted, interpreter startup itself is not.
+
+  python benchmarks/bench_startup.py [--budget MS] [--runs N]
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# documented budget for zzz import + ZScript() + one command dispatch
+STARTUP_BUDGET_MS = 100.0
+
+HEAVY_MODULES = ("cmd2", "rich", "pydantic")
+
+SNIPPET = """
+import sys
+import time
+import zzz
+
+ZScript = zzz.ZScript  # lazy export, resolve (import) outside of the timing
+start = time.perf_counter()
+script = ZScript()
+construct_ms = (time.perf_counter() - start) * 1000
+
+@script.on("echo")
+def echo(text, count: int = 1):
+  return text * count
+
+script.commands.get("echo").run_cli(["x", "--count", "2"])
+print(",".join(sorted({{m.split(".")[0] for m in sys.modules}} & {heavy!r})))
+print(construct_ms)
+"""
+
+
+def _parse_importtime(stderr):
+  # top level entries only, nested ones are already in their cumulative time
+  total_us = 0
+  for line in stderr.splitlines():
+    if not line.startswith("import time:"):
+      continue
+    parts = line[len("import time:"):].split("|")
+    if len(parts) != 3 or not parts[1].strip().isdigit():
+      continue
+    name = parts[2][1:]
+    if name.startswith(" "):  # nested
+      continue
+    if name.strip().split(".")[0] == "zzz":
+      total_us += int(parts[1])
+  return total_us / 1000
+
+
+def measure_once():
+  env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+  start = time.perf_counter()
+  proc = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", SNIPPET.format(heavy=set(HEAVY_MODULES))],
+    capture_output=True, text=True, env=env, check=True
+  )
+  wall_ms = (time.perf_counter() - start) * 1000
+  heavy, construct_ms = proc.stdout.splitlines()[:2]
+  return {
+    "import_ms": _parse_importtime(proc.stderr),
+    "construct_ms": float(construct_ms),
+    "wall_ms": wall_ms,
+    "heavy_modules": [m for m in heavy.split(",") if m],
+  }
+
+
+def run(runs: int = 5):
+  samples = [measure_once() for _ in range(runs)]
+  return {
+    "import_ms": min(s["import_ms"] for s in samples),
+    "construct_ms": min(s["construct_ms"] for s in samples),
+    "wall_ms": min(s["wall_ms"] for s in samples),
+    "heavy_modules": sorted({m for s in samples for m in s["heavy_modules"]}),
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description="zzz cli startup regression check")
+  parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS, help="zzz import budget in ms")
+  parser.add_argument("--runs", type=int, default=5)
+  args = parser.parse_args()
+
+  result = run(args.runs)
+  print(f"zzz import : {result['import_ms']:.1f} ms (budget {args.budget:.1f} ms)")
+  print(f"ZScript()  : {result['construct_ms']:.2f} ms")
+  print(f"wall       : {result['wall_ms']:.1f} ms (interpreter included)")
+
+  failed = False
+  if result["heavy_modules"]:
+    print(f"FAIL: heavy modules imported on cli path: {', '.join(result['heavy_modules'])}")
+    failed = True
+  if result["import_ms"] > args.budget:
+    print("FAIL: startup budget exceeded")
+    failed = True
+
+  if not failed:
+    print("OK")
+  return 1 if failed else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
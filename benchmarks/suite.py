@@ -0,0 +1,147 @@
+"""
+Runs every benchmark and writes one JSON file that can be compared between
+commits.
+
+  python benchmarks/suite.py -o before.json
+  git checkout my-branch
+  python benchmarks/suite.py -o after.json --compare before.json [--threshold 0.15]
+
+Metrics are flattened to "<bench>.<key>" numbers. Rates (keys ending in
+"_s": calls_s, mib_s, lines_s, ...) should go up, times and sizes (_ms,
+_us, _kb) down. --compare exits 1 when a metric got worse than
+--threshold (relative). Everything runs offline, benchmarks whose
+dependencies are not installed are skipped. --quick uses small sizes
+for a smoke run.
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(HERE.parent))
+
+import bench_startup
+import bench_registry
+import bench_dispatch
+import bench_process
+import bench_render
+import bench_shell_session
+import bench_qshare
+
+# name - (run, full kwargs, --quick kwargs)
+BENCHMARKS = {
+  "startup": (bench_startup.run, dict(runs=5), dict(runs=2)),
+  "registry": (bench_registry.run, dict(sizes=(1000, 10000)), dict(sizes=(1000,))),
+  "dispatch": (bench_dispatch.run, dict(number=100_000), dict(number=10_000)),
+  "process": (bench_process.run, dict(calls=200, mib=64, lines=500_000), dict(calls=50, mib=8, lines=50_000)),
+  "session": (bench_shell_session.run, dict(calls=500), dict(calls=100)),
+  "render": (bench_render.run, dict(rows=10_000, items=10_000), dict(rows=1000, items=1000)),
+  "qshare": (bench_qshare.run, dict(files=100_000), dict(files=10_000)),
+}
+
+DEFAULT_THRESHOLD = 0.15
+
+
+def flatten(result, prefix: str = ""):
+  """{"a": {"b_ms": 1}} -> {"a.b_ms": 1}, non numeric values are dropped"""
+  flat = {}
+  for key, value in result.items():
+    name = f"{prefix}{key}"
+    if isinstance(value, dict):
+      flat.update(flatten(value, f"{name}."))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+      flat[name] = value
+  return flat
+
+
+def higher_is_better(metric: str) -> bool:
+  return metric.endswith("_s")
+
+
+def _git_commit():
+  try:
+    return subprocess.run(
+      ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+    ).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def run(names=None, quick: bool = False):
+  metrics = {}
+  for name, (func, kwargs, quick_kwargs) in BENCHMARKS.items():
+    if names and name not in names:
+      continue
+    print(f"running {name} ...", file=sys.stderr, flush=True)
+    try:
+      result = func(**(quick_kwargs if quick else kwargs))
+    except ModuleNotFoundError as e:
+      # optional dependency of the benchmarked code (fastapi for qshare)
+      print(f"skipped {name}: {e}", file=sys.stderr, flush=True)
+      continue
+    metrics.update(flatten(result, f"{name}."))
+
+  return {
+    "commit": _git_commit(),
+    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "quick": quick,
+    "metrics": metrics,
+  }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD):
+  """(metric, old, new, change, regressed) for metrics present in both runs"""
+  rows = []
+  for metric, new in current["metrics"].items():
+    old = baseline["metrics"].get(metric)
+    if old is None or old == 0:
+      continue
+    change = (new - old) / old
+    worse = -change if higher_is_better(metric) else change
+    rows.append((metric, old, new, change, worse > threshold))
+  return rows
+
+
+def main():
+  parser = argparse.ArgumentParser(description="zzz benchmark suite")
+  parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run (default: all)")
+  parser.add_argument("--quick", action="store_true", help="small sizes, for a smoke run")
+  parser.add_argument("-o", "--output", help="write the results json here (default: stdout)")
+  parser.add_argument("--compare", metavar="BASELINE", help="results json of a previous run")
+  parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed relative slowdown")
+  args = parser.parse_args()
+
+  result = run(args.only, args.quick)
+  text = json.dumps(result, indent=2)
+  if args.output:
+    Path(args.output).write_text(text + "\n")
+  else:
+    print(text)
+
+  if not args.compare:
+    return 0
+
+  baseline = json.loads(Path(args.compare).read_text())
+  regressions = 0
+  print(f"\n{'metric':<36} {'baseline':>12} {'current':>12} {'change':>8}", file=sys.stderr)
+  for metric, old, new, change, regressed in compare(baseline, result, args.threshold):
+    regressions += regressed
+    flag = "  REGRESSION" if regressed else ""
+    print(f"{metric:<36} {old:12.2f} {new:12.2f} {change:+8.1%}{flag}", file=sys.stderr)
+
+  if regressions:
+    print(f"\n{regressions} metric(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+    return 1
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
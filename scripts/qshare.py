@@ -1,7 +1,13 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
+from collections import OrderedDict
+from urllib.parse import quote
 from pathlib import Path
+import os
+import html
+import threading
 import mimetypes
 import uvicorn
 
@@ -22,50 +28,77 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 
-@app.get("/", response_class=HTMLResponse)
-async def index():
-  return await list_directory("")
+# ---- directory listings
 
-@app.get("/browse/{path:path}", response_class=HTMLResponse)
-async def list_directory(path: str):
+# entries per page, ?offset=&limit= pick another page
+PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+# listings kept in memory: path - (directory mtime_ns, entries)
+LISTING_CACHE_SIZE = 32
+_listings = OrderedDict()
+_listings_lock = threading.Lock()
+
+
+def scan_directory(target_dir: Path):
+  """(name, is_dir, size) of every entry sorted by name: one scandir, a stat for files only"""
+  entries = []
+  with os.scandir(target_dir) as it:
+    for entry in it:
+      try:
+        is_dir = entry.is_dir()
+        size = None if is_dir else entry.stat().st_size
+      except OSError:
+        # broken symlink or gone since the scandir
+        is_dir, size = False, None
+      entries.append((entry.name, is_dir, size))
+  entries.sort()
+  return entries
+
+def get_listing(target_dir: Path):
   """
-  Browse directory with TailwindCSS UI + search bar.
+  scan_directory, cached until the directory's mtime changes (an entry
+  added, removed or renamed). Sizes of files written in place are the
+  ones of the last scan.
   """
+  key = str(target_dir)
+  mtime = os.stat(target_dir).st_mtime_ns
+  with _listings_lock:
+    cached = _listings.get(key)
+    if cached is not None and cached[0] == mtime:
+      _listings.move_to_end(key)
+      return cached[1]
+
+  entries = scan_directory(target_dir)
+  with _listings_lock:
+    _listings[key] = (mtime, entries)
+    _listings.move_to_end(key)
+    while len(_listings) > LISTING_CACHE_SIZE:
+      _listings.popitem(last=False)
+  return entries
+
+def load_listing(path: str):
+  # runs in a worker thread, every call here touches the disk
   target_dir = (SHARED_DIR / path).resolve()
 
-  if not target_dir.exists() or not target_dir.is_dir() or (
+  if not target_dir.is_dir() or (
     SHARED_DIR not in target_dir.parents and target_dir != SHARED_DIR
   ):
     raise HTTPException(status_code=404, detail="Directory not found")
+  return target_dir, get_listing(target_dir)
 
-  # Build directory listing rows
-  rows_html = ""
-  if target_dir != SHARED_DIR:
-    parent_rel = str(Path(path).parent)
-    rows_html += f"""
-    <tr class='hover:bg-gray-300 bg-gray-200'>
-      <td class='p-2'><a class='text-blue-500 hover:underline' href='/browse/{parent_rel}'>⬅️ Back</a></td>
-      <td></td>
-    </tr>
-    """
-  for item in sorted(target_dir.iterdir()):
-    rel_path = (Path(path) / item.name).as_posix()
-    if item.is_dir():
-      rows_html += f"""
-      <tr class='hover:bg-gray-100 file-row'>
-        <td class='p-2'>📁 <a class='text-blue-600 hover:underline' href='/browse/{rel_path}'>{item.name}/</a></td>
-        <td class='text-gray-400 p-2'>Directory</td>
-      </tr>
-      """
-    else:
-      rows_html += f"""
-      <tr class='hover:bg-gray-100 file-row'>
-        <td class='p-2'>📄 <a class='text-blue-600 hover:underline' href='/download/{rel_path}' download>{item.name}</a></td>
-        <td class='text-gray-400 p-2'>{round(item.stat().st_size/1024,1)} KB</td>
-      </tr>
-      """
+def _format_size(size):
+  return "-" if size is None else f"{round(size / 1024, 1)} KB"
 
-  html = f"""
+def _page_url(path: str, offset: int, limit: int) -> str:
+  return f"/browse/{quote(path)}?offset={offset}&limit={limit}"
+
+def render_listing(path: str, target_dir: Path, entries, offset: int, limit: int):
+  """The listing page, yielded in chunks (rows are never joined into one string)"""
+  page = entries[offset:offset + limit]
+  total = len(entries)
+  title = html.escape(path)
+
+  yield f"""
   <!DOCTYPE html>
   <html>
   <head>
@@ -76,11 +109,11 @@ async def list_directory(path: str):
   </head>
   <body class="bg-gray-50 text-gray-900">
     <div class="p-3 bg-gradient-to-b from-orange-200 to-orange-400 font-bold">QShare</div>
-    <div class="p-2 bg-white/60 font-bold shadow-lg md:text-2xl">📂 /{path}</div>
+    <div class="p-2 bg-white/60 font-bold shadow-lg md:text-2xl">📂 /{title}</div>
     <div class="container mx-auto p-6">
       <!-- Search bar -->
       <div class="mb-4">
-        <input type="text" id="searchInput" placeholder="Search files..." 
+        <input type="text" id="searchInput" placeholder="Search files on this page..." 
           class="w-full p-2 border shadow-sm focus:border-orange-400 focus:outline-none"
           onkeyup="filterFiles()">
       </div>
@@ -93,9 +126,52 @@ async def list_directory(path: str):
           </tr>
         </thead>
         <tbody id="fileTableBody">
-          {rows_html}
+  """
+
+  if target_dir != SHARED_DIR:
+    parent_rel = Path(path).parent.as_posix()
+    yield f"""
+    <tr class='hover:bg-gray-300 bg-gray-200'>
+      <td class='p-2'><a class='text-blue-500 hover:underline' href='/browse/{quote("" if parent_rel == "." else parent_rel)}'>⬅️ Back</a></td>
+      <td></td>
+    </tr>
+    """
+
+  rows = []
+  for name, is_dir, size in page:
+    rel_path = quote((Path(path) / name).as_posix())
+    label = html.escape(name)
+    if is_dir:
+      rows.append(f"""
+      <tr class='hover:bg-gray-100 file-row'>
+        <td class='p-2'>📁 <a class='text-blue-600 hover:underline' href='/browse/{rel_path}'>{label}/</a></td>
+        <td class='text-gray-400 p-2'>Directory</td>
+      </tr>
+      """)
+    else:
+      rows.append(f"""
+      <tr class='hover:bg-gray-100 file-row'>
+        <td class='p-2'>📄 <a class='text-blue-600 hover:underline' href='/download/{rel_path}' download>{label}</a></td>
+        <td class='text-gray-400 p-2'>{_format_size(size)}</td>
+      </tr>
+      """)
+    if len(rows) == 200:
+      yield "".join(rows)
+      rows = []
+  yield "".join(rows)
+
+  pager = []
+  if offset > 0:
+    pager.append(f"<a class='text-blue-600 hover:underline' href='{_page_url(path, max(0, offset - limit), limit)}'>⬅️ Previous</a>")
+  if total:
+    pager.append(f"<span class='text-gray-500'>{offset + 1 if page else offset}-{offset + len(page)} of {total}</span>")
+  if offset + limit < total:
+    pager.append(f"<a class='text-blue-600 hover:underline' href='{_page_url(path, offset + limit, limit)}'>Next ➡️</a>")
+
+  yield f"""
         </tbody>
       </table>
+      <div class="mt-4 flex gap-4">{" ".join(pager)}</div>
     </div>
 
     <script>
@@ -112,7 +188,49 @@ async def list_directory(path: str):
   </body>
   </html>
   """
-  return HTMLResponse(content=html)
+
+@app.get("/", response_class=HTMLResponse)
+async def index(
+  offset: int = Query(0, ge=0),
+  limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+  return await list_directory("", offset, limit)
+
+@app.get("/browse/{path:path}", response_class=HTMLResponse)
+async def list_directory(
+  path: str,
+  offset: int = Query(0, ge=0),
+  limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+  """
+  Browse directory with TailwindCSS UI + search bar, one page of entries.
+  """
+  # scandir / stat of a big directory must not block the event loop
+  target_dir, entries = await run_in_threadpool(load_listing, path)
+  return StreamingResponse(
+    render_listing(path, target_dir, entries, offset, limit),
+    media_type="text/html"
+  )
+
+@app.get("/api/list")
+@app.get("/api/list/{path:path}")
+async def list_directory_json(
+  path: str = "",
+  offset: int = Query(0, ge=0),
+  limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+  """One page of a directory listing as JSON"""
+  _, entries = await run_in_threadpool(load_listing, path)
+  return {
+    "path": path,
+    "offset": offset,
+    "limit": limit,
+    "total": len(entries),
+    "entries": [
+      {"name": name, "dir": is_dir, "size": size}
+      for name, is_dir, size in entries[offset:offset + limit]
+    ],
+  }
 
 
 @app.get("/download/{path:path}")
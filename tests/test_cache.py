@@ -0,0 +1,42 @@
+import pytest
+
+from zzz.core.context.cache import ScriptCache
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+  monkeypatch.setenv("ZZZ_HOME", str(tmp_path))
+
+
+def test_same_named_scripts_do_not_share_results(tmp_path):
+  calls = []
+
+  def who(n):
+    calls.append(n)
+    return n
+
+  a = ScriptCache(tmp_path / "a" / "tool.py")(disk=True)(who)
+  b = ScriptCache(tmp_path / "b" / "tool.py")(disk=True)(who)
+  assert a.directory != b.directory
+  a(1)
+  b(1)
+  assert calls == [1, 1]
+
+
+def test_edited_function_misses(tmp_path):
+  cache = ScriptCache(tmp_path / "tool.py")
+
+  def who(n):
+    return "old"
+  assert cache()(who)(1) == "old"
+
+  def who(n):
+    return "new"
+  assert cache()(who)(1) == "new"
+
+
+def test_dict_and_set_arguments_are_canonical(tmp_path):
+  cached = ScriptCache(tmp_path / "tool.py")()(lambda value: None)
+  assert cached.key({"a": 1, "b": {2, 3}}) == cached.key({"b": {3, 2}, "a": 1})
+  assert cached.key({1, "x", 2.5}) == cached.key({2.5, "x", 1})
+  assert cached.key([1, 2]) != cached.key((1, 2))
@@ -0,0 +1,64 @@
+import inspect
+
+import pytest
+
+from zzz.core.context.command import CallPlan, ScriptCommand
+
+
+def call(func, **arg_dict):
+  return CallPlan(inspect.signature(func)).call(func, arg_dict)
+
+
+def test_required_positional_and_defaulted_keyword():
+  def f(a, b=2):
+    return a, b
+  assert call(f, a=1) == (1, 2)
+  assert call(f, a=1, b=3) == (1, 3)
+
+
+def test_positional_only():
+  def f(a, b=2, /, c=3):
+    return a, b, c
+  assert call(f, a=1, c=4) == (1, 2, 4)
+  assert call(f, a=1, b=5, c=4) == (1, 5, 4)
+
+
+def test_defaults_before_varargs_are_positional():
+  def echo(text, count: int = 1, *rest, **kw):
+    return text, count, rest
+  assert call(echo, text="a", count=1, rest=["b", "c"]) == ("a", 1, ("b", "c"))
+  assert call(echo, text="a", count=2, rest=[]) == ("a", 2, ())
+
+
+def test_keyword_only():
+  def f(a, *rest, flag=False, level):
+    return a, rest, flag, level
+  assert call(f, a=1, rest=[2], level=3) == (1, (2,), False, 3)
+  assert call(f, a=1, rest=[], flag=True, level=0) == (1, (), True, 0)
+
+
+def test_kwargs_passthrough():
+  def f(a, **extra):
+    return a, extra
+  assert call(f, a=1, b=2, c=3) == (1, {"b": 2, "c": 3})
+
+
+def test_unmatched_args_dropped_without_kwargs():
+  def f(a):
+    return a
+  assert call(f, a=1, cmd2_statement="x") == 1
+
+
+def test_unfilled_parameter_takes_its_default():
+  # an Arg with another dest leaves the parameter out of the parsed args
+  def f(a, b=2, *rest):
+    return a, b, rest
+  assert call(f, a=1, rest=[3]) == (1, 2, (3,))
+
+
+def test_run_cli_binds_like_the_signature():
+  def echo(text, count: int = 1, *rest, **kw):
+    return text, count, rest
+  command = ScriptCommand("echo", echo)
+  assert command.run_cli(["a", "b", "c"]) == ("a", 1, ("b", "c"))
+  assert command.run_cli(["a", "b", "--count", "2"]) == ("a", 2, ("b",))
@@ -0,0 +1,33 @@
+import pytest
+
+from zzz import ZScript
+from zzz.core.runner.cli import ZScriptRunnerCli
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+  monkeypatch.setenv("ZZZ_HOME", str(tmp_path))
+  script = ZScript("test")
+
+  @script.on("echo")
+  def echo(text: str):
+    print(text)
+
+  return ZScriptRunnerCli(script)
+
+
+def test_batch_runs_file(runner, tmp_path, capsys):
+  path = tmp_path / "lines.txt"
+  path.write_text("echo one\n# comment\necho two\n")
+  runner.run_batch([str(path)])
+  out, err = capsys.readouterr()
+  assert out.split() == ["one", "two"]
+  assert "2 lines, 2 ok" in err
+
+
+def test_batch_missing_file_exits_2(runner, tmp_path, capsys):
+  with pytest.raises(SystemExit) as exit:
+    runner.run_batch([str(tmp_path / "missing.txt")])
+  assert exit.value.code == 2
+  out, err = capsys.readouterr()
+  assert "cannot read" in out + err
@@ -0,0 +1,29 @@
+import threading
+
+from zzz.core.completion import ArgCompleter
+
+
+def test_concurrent_refresh_starts_one_load():
+  calls = []
+  release = threading.Event()
+
+  def hosts():
+    calls.append(1)
+    release.wait(5)
+    return ["alpha", "beta"]
+
+  completer = ArgCompleter(hosts, ttl=None)
+  threads = [threading.Thread(target=completer.refresh) for _ in range(8)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+
+  load = completer.refresh()
+  release.set()
+  load.join(5)
+  assert len(calls) == 1
+  assert completer._thread is None
+  assert completer.complete("al") == ["alpha"]
+  # loaded and ttl=None: no new load
+  assert len(calls) == 1
@@ -0,0 +1,38 @@
+import sys
+
+import pytest
+
+from cmd2.utils import StdSim
+
+from zzz import ZScript
+from zzz.core.runner.interactive import ZScriptRunner
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+  monkeypatch.setenv("ZZZ_HOME", str(tmp_path))
+  script = ZScript("test")
+
+  @script.on("echo")
+  def echo(text: str):
+    return text
+
+  return ZScriptRunner(script)
+
+
+def test_trailing_ampersand_runs_script_command_in_background(runner):
+  statement = runner.precmd(runner.statement_parser.parse("echo hi &"))
+  assert statement.command == "bg"
+  assert statement.args == "echo hi"
+
+
+def test_trailing_ampersand_keeps_builtins(runner, capfd):
+  statement = runner.statement_parser.parse("shell echo shell-bg &")
+  assert runner.precmd(statement) is statement
+
+  # a StdSim stdout is piped, the output of the backgrounded echo is read to EOF
+  runner.stdout = StdSim(sys.stdout)
+  runner.onecmd_plus_hooks("shell echo shell-bg &")
+  out, err = capfd.readouterr()
+  assert "not found" not in out + err
+  assert "shell-bg" in runner.stdout.getvalue()
@@ -0,0 +1,54 @@
+import os
+import time
+
+from zzz.modules.process import sh, sh_map
+
+
+def test_lines_starts_on_first_next(tmp_path):
+  marker = tmp_path / "ran"
+  lines = sh(f"touch {marker}; echo a; echo b").lines()
+  time.sleep(0.2)
+  assert not marker.exists()
+  assert list(lines) == ["a", "b"]
+  assert marker.exists()
+
+
+def test_lines_closed_early_kills_the_process(tmp_path):
+  pidfile = tmp_path / "pid"
+  lines = sh(f"echo $$ > {pidfile}; yes").lines()
+  assert next(lines) == "y"
+  pid = int(pidfile.read_text())
+  lines.close()
+  try:
+    os.kill(pid, 0)
+  except ProcessLookupError:
+    pass
+  else:
+    raise AssertionError("process still running")
+
+
+def test_chunks():
+  assert b"".join(sh("printf abcdef").chunks(2)) == b"abcdef"
+
+
+def test_map_template_errors_are_results():
+  results = list(sh_map("echo {}", ["a", {"k": 1}, "b"]))
+  assert [r.ok for r in results] == [True, False, True]
+  assert isinstance(results[1].exception, IndexError)
+  assert [results[0].output(), results[2].output()] == ["a", "b"]
+
+
+def test_map_break_does_not_wait_for_running_commands():
+  start = time.monotonic()
+  for ordered in (True, False):
+    results = sh_map(["echo first"] + ["sleep 30"] * 5, workers=4, ordered=ordered)
+    first = next(results)
+    assert first.output() == "first"
+    results.close()
+  assert time.monotonic() - start < 5
+
+
+def test_map_timeout():
+  result, = sh_map(["sleep 30"], timeout=0.2)
+  assert not result.ok
+  assert result.exception is not None
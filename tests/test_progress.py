@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+from rich.console import Console
+
+from zzz.core.context.progress import ScriptProgress
+
+
+class TerminalConsole(Console):
+  output_mode = None
+
+  def __init__(self):
+    super().__init__(file=io.StringIO(), force_terminal=True, width=80)
+
+  def sync(self):
+    pass
+
+
+class FakeScript:
+  def __init__(self):
+    self.scr = TerminalConsole()
+
+
+@pytest.fixture
+def view():
+  view = ScriptProgress(FakeScript())
+  yield view
+  view.close_all()
+
+
+def test_total_only_bar_is_not_iterable(view):
+  bar = view.bar(total=10)
+  with pytest.raises(TypeError, match="not iterable"):
+    iter(bar)
+
+
+def test_iterating_counts_and_stops_the_view(view):
+  assert list(view.bar(range(3))) == [0, 1, 2]
+  assert view._live is None
+
+
+def test_close_all_stops_a_view_left_open(view):
+  # a loop left half way (its generator still referenced) and a bar never closed
+  items = iter(view.bar(range(10)))
+  next(items)
+  unclosed = view.bar(total=5)
+  assert view._live is not None
+
+  view.close_all()
+  assert unclosed.done
+  assert view._live is None
+
+
+def test_context_manager_closes(view):
+  with view.bar(total=2) as bar:
+    bar.advance()
+  assert bar.done
+  assert view._live is None
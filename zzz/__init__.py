@@ -1,10 +1,34 @@
-from .core.context import ZScript, Arg
-from .core.runner import run_script, run_script_cli, run_script_it
+import importlib
+
+# public exports are resolved on first access so `import zzz` stays cheap,
+# cli runs never pay for cmd2 / rich / pydantic unless they use them
+_EXPORTS = {
+  "Arg": "zzz.core.context.command",
+  "ZScript": "zzz.core.context.script",
+  "run_script": "zzz.core.runner",
+  "run_script_it": "zzz.core.runner",
+  "run_script_cli": "zzz.core.runner",
+  "run_script_daemon": "zzz.core.runner",
+}
 
 __all__ = [
   "Arg",
   "ZScript",
   "run_script",
   "run_script_it",
-  "run_script_cli"
-]
\ No newline at end of file
+  "run_script_cli",
+  "run_script_daemon"
+]
+
+def __getattr__(name):
+  module = _EXPORTS.get(name)
+  if module is None:
+    raise AttributeError(f"module 'zzz' has no attribute '{name}'")
+
+  value = getattr(importlib.import_module(module), name)
+  # cache it, next lookups skip __getattr__
+  globals()[name] = value
+  return value
+
+def __dir__():
+  return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,180 @@
+import os
+import sys
+import argparse
+import subprocess
+
+from zzz.core.manifest import load_manifest, complete_words, completion_script, ManifestScript
+
+
+def refresh_manifest(script):
+  # manifest missing or stale, let the script write it (imports it once per change)
+  try:
+    subprocess.run(
+      [sys.executable, script, "--zzz-manifest"],
+      stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+      timeout=60
+    )
+  except (OSError, subprocess.TimeoutExpired):
+    return None
+  return load_manifest(script)
+
+def get_manifest(script):
+  return load_manifest(script) or refresh_manifest(script)
+
+# python -m zzz complete <script> <cword> <words...>
+def complete(argv) -> int:
+  if len(argv) < 2:
+    return 1
+
+  script, cword, words = argv[0], argv[1], argv[2:]
+  data = get_manifest(script)
+  if data is None:
+    return 1
+
+  candidates = complete_words(data, words, int(cword))
+  if candidates:
+    sys.stdout.write("\n".join(candidates) + "\n")
+  return 0
+
+def show_help(script, command=None) -> int:
+  data = get_manifest(script)
+  if data is None:
+    print(f"zzz: no manifest for '{script}'", file=sys.stderr)
+    return 1
+
+  manifest_script = ManifestScript(data)
+  if command is None:
+    from zzz.core.runner.cli import ZScriptRunnerCli
+    ZScriptRunnerCli(manifest_script)._display_cli_help()
+    return 0
+
+  cmd = manifest_script.commands.get(command)
+  if cmd is None:
+    print(f"zzz: command '{command}' not found", file=sys.stderr)
+    return 1
+  print(cmd.argparser.format_help(), end="")
+  return 0
+
+def resolve_script(script):
+  """A script path as is, else a catalog name"""
+  if os.path.exists(script):
+    return script
+  from zzz.core.catalog import find_script
+  return find_script(script) or script
+
+# ---- catalog: zzz list / search / path / <script> <command>
+
+def print_scripts(entries) -> int:
+  entries = list(entries)
+  if not entries:
+    print("zzz: no scripts (add a directory with: zzz path add DIR)", file=sys.stderr)
+    return 1
+  width = max(len(name) for name, _, _ in entries)
+  for name, path, info in entries:
+    commands = " ".join(command["name"] for command in info["commands"])
+    print(f"{name:<{width}}  {info.get('desc') or ''}".rstrip())
+    if commands:
+      print(f"{'':<{width}}  [{commands}]")
+  return 0
+
+def manage_paths(action, directory) -> int:
+  from zzz.core.catalog import script_dirs, add_dir, remove_dir, load_catalog
+
+  if action == "add":
+    try:
+      print(add_dir(directory))
+    except Exception as e:
+      print(f"zzz: {e}", file=sys.stderr)
+      return 1
+  elif action == "remove":
+    if not remove_dir(directory):
+      print(f"zzz: '{directory}' is not a saved directory", file=sys.stderr)
+      return 1
+  else:
+    for d in script_dirs():
+      print(d)
+    return 0
+  load_catalog()
+  return 0
+
+def run_catalog_script(name, argv) -> int:
+  from zzz.core.catalog import find_script
+
+  path = find_script(name)
+  if path is None:
+    print(f"zzz: script '{name}' not found (zzz list shows the known ones)", file=sys.stderr)
+    return 1
+  command = [sys.executable, path, *argv]
+  if os.name == "posix":
+    # the script takes over this process (signals, tty, exit code)
+    os.execv(sys.executable, command)
+  return subprocess.run(command).returncode
+
+def make_parser():
+  parser = argparse.ArgumentParser(
+    prog="zzz",
+    description="zzz script tools, `zzz <script> [command] [ARGS]` runs a script of the catalog"
+  )
+  subparsers = parser.add_subparsers(dest="action")
+
+  subparsers.add_parser("list", help="List the scripts of the catalog (default)")
+
+  search_parser = subparsers.add_parser("search", help="Search scripts by name, description and commands")
+  search_parser.add_argument("term")
+
+  path_parser = subparsers.add_parser("path", help="Show / add / remove script directories (also: ZZZ_PATH)")
+  path_parser.add_argument("path_action", nargs="?", choices=["add", "remove"])
+  path_parser.add_argument("directory", nargs="?")
+
+  run_parser = subparsers.add_parser("run", help="Run a catalog script (for names clashing with these subcommands)")
+  run_parser.add_argument("script")
+  run_parser.add_argument("argv", nargs=argparse.REMAINDER)
+
+  help_parser = subparsers.add_parser("help", help="Show script help from its manifest (path or catalog name)")
+  help_parser.add_argument("script")
+  help_parser.add_argument("command", nargs="?")
+
+  completion_parser = subparsers.add_parser("completion", help="Print a shell completion script")
+  completion_parser.add_argument("shell", choices=["bash", "zsh"])
+  completion_parser.add_argument("script")
+
+  # handled before argparse, listed for -h only
+  subparsers.add_parser("complete", help="Completion candidates (used by completion scripts)")
+  return parser
+
+SUBCOMMANDS = ("list", "search", "path", "run", "help", "completion", "complete")
+
+def main(argv=None) -> int:
+  argv = sys.argv[1:] if argv is None else argv
+
+  # hot path, runs on every tab press
+  if argv and argv[0] == "complete":
+    return complete(argv[1:])
+
+  # zzz <script> [command] [ARGS]: one catalog lookup, nothing else imported
+  if argv and argv[0] not in SUBCOMMANDS and not argv[0].startswith("-"):
+    return run_catalog_script(argv[0], argv[1:])
+
+  args = make_parser().parse_args(argv)
+  if args.action in (None, "list"):
+    from zzz.core.catalog import load_catalog
+    return print_scripts(load_catalog().entries())
+  if args.action == "search":
+    from zzz.core.catalog import load_catalog
+    return print_scripts(load_catalog().search(args.term))
+  if args.action == "path":
+    if args.path_action and not args.directory:
+      print("zzz: path add / remove needs a directory", file=sys.stderr)
+      return 2
+    return manage_paths(args.path_action, args.directory)
+  if args.action == "run":
+    return run_catalog_script(args.script, args.argv)
+  if args.action == "help":
+    return show_help(resolve_script(args.script), args.command)
+  if args.action == "completion":
+    print(completion_script(args.shell, resolve_script(args.script), sys.executable), end="")
+    return 0
+  return 1
+
+if __name__ == "__main__":
+  sys.exit(main())
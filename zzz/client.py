@@ -0,0 +1,121 @@
+"""
+Thin client for resident zzz scripts
+
+  python -m zzz.client script.py command [ARGS]
+
+Connects to the script's daemon (`script.py --zzz-daemon`, started on
+demand) over a unix socket in ~/.zzz/daemons and hands it argv, cwd, env
+and this process' stdin / stdout / stderr, so output goes straight to the
+terminal. Only the exit code comes back.
+Keep this module import-light, it runs on every call.
+"""
+import os
+import sys
+import json
+import time
+import array
+import socket
+import signal
+import hashlib
+
+# seconds to wait for a freshly started daemon (script import / warm-up)
+START_TIMEOUT = 60.0
+
+
+def daemons_dir() -> str:
+  # same as zzz.utils.path.zzz_home() without importing pathlib
+  home = os.environ.get("ZZZ_HOME") or os.path.join(os.path.expanduser("~"), ".zzz")
+  return os.path.join(home, "daemons")
+
+def socket_path(script_path: str) -> str:
+  digest = hashlib.sha1(os.path.abspath(script_path).encode()).hexdigest()[:16]
+  return os.path.join(daemons_dir(), f"{digest}.sock")
+
+def send_fds(sock, data: bytes, fds) -> None:
+  sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))])
+
+def recv_fds(sock, size: int, max_fds: int):
+  fds = array.array("i")
+  data, ancdata, _, _ = sock.recvmsg(size, socket.CMSG_LEN(max_fds * fds.itemsize))
+  for level, kind, cdata in ancdata:
+    if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+      fds.frombytes(cdata[:len(cdata) - (len(cdata) % fds.itemsize)])
+  return data, list(fds)
+
+
+def _connect(path: str):
+  sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    sock.connect(path)
+    return sock
+  except OSError:
+    sock.close()
+    return None
+
+def _start_daemon(script: str, path: str):
+  import subprocess
+
+  os.makedirs(daemons_dir(), mode=0o700, exist_ok=True)
+  with open(path[:-len(".sock")] + ".log", "ab") as log:
+    subprocess.Popen(
+      [sys.executable, script, "--zzz-daemon"],
+      stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+      start_new_session=True
+    )
+
+  deadline = time.monotonic() + START_TIMEOUT
+  while time.monotonic() < deadline:
+    sock = _connect(path)
+    if sock is not None:
+      return sock
+    time.sleep(0.01)
+  raise SystemExit(f"zzz: daemon for '{script}' did not start, see {path[:-len('.sock')]}.log")
+
+def _call(sock, script: str, argv: list):
+  header = json.dumps({"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}).encode() + b"\n"
+  send_fds(sock, header, [0, 1, 2])
+
+  reader = sock.makefile("rb")
+  pid = None
+  while True:
+    try:
+      line = reader.readline()
+    except KeyboardInterrupt:
+      # forward ctrl+c to the command, keep waiting for its exit code
+      if pid is not None:
+        os.kill(pid, signal.SIGINT)
+      continue
+
+    if not line:
+      return 1  # daemon died
+    kind, _, value = line.decode().strip().partition(" ")
+    if kind == "pid":
+      pid = int(value)
+    elif kind == "exit":
+      return int(value)
+    elif kind == "stale":
+      return None  # script changed, daemon is restarting
+
+def run(script: str, argv: list) -> int:
+  script = os.path.abspath(script)
+  path = socket_path(script)
+
+  for _ in range(3):
+    sock = _connect(path) or _start_daemon(script, path)
+    try:
+      code = _call(sock, script, argv)
+    finally:
+      sock.close()
+    if code is not None:
+      return code
+  raise SystemExit(f"zzz: daemon for '{script}' keeps restarting")
+
+def main(argv=None) -> int:
+  argv = sys.argv[1:] if argv is None else argv
+  if not argv or argv[0] in ("-h", "--help"):
+    print("usage: python -m zzz.client script.py [command] [ARGS]", file=sys.stderr)
+    return 2
+  return run(argv[0], argv[1:])
+
+if __name__ == "__main__":
+  sys.exit(main())
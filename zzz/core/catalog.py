@@ -0,0 +1,233 @@
+import os
+import json
+
+from zzz.utils.path import zzz_home
+
+
+# Catalog: the zzz scripts found in the configured directories (ZZZ_PATH and
+# ~/.zzz/paths) with their description and commands, kept in
+# ~/.zzz/catalog.json. Files are found with one scandir per directory and
+# only new or changed files (mtime / size) are parsed, statically, scripts
+# are never imported.
+CATALOG_VERSION = 1
+
+# ZScript(name, version, author, desc) positional order
+_SCRIPT_ARGS = ("name", "version", "author", "desc")
+
+
+def catalog_file() -> str:
+  return os.path.join(zzz_home(), "catalog.json")
+
+def paths_file() -> str:
+  return os.path.join(zzz_home(), "paths")
+
+# ---- configured directories
+
+def _saved_dirs() -> list:
+  try:
+    with open(paths_file(), "r") as file:
+      return [line.strip() for line in file if line.strip()]
+  except OSError:
+    return []
+
+def script_dirs() -> list:
+  """ZZZ_PATH (os.pathsep separated) first, then the directories added with `zzz path add`"""
+  dirs = [d for d in os.environ.get("ZZZ_PATH", "").split(os.pathsep) if d]
+  seen, result = set(), []
+  for directory in dirs + _saved_dirs():
+    directory = os.path.abspath(os.path.expanduser(directory))
+    if directory not in seen:
+      seen.add(directory)
+      result.append(directory)
+  return result
+
+def _write_dirs(dirs) -> None:
+  os.makedirs(zzz_home(), exist_ok=True)
+  with open(paths_file(), "w") as file:
+    file.write("".join(f"{d}\n" for d in dirs))
+
+def add_dir(directory: str) -> str:
+  directory = os.path.abspath(os.path.expanduser(directory))
+  if not os.path.isdir(directory):
+    raise Exception(f"'{directory}' is not a directory")
+  dirs = _saved_dirs()
+  if directory not in dirs:
+    _write_dirs(dirs + [directory])
+  return directory
+
+def remove_dir(directory: str) -> bool:
+  directory = os.path.abspath(os.path.expanduser(directory))
+  dirs = _saved_dirs()
+  if directory not in dirs:
+    return False
+  _write_dirs([d for d in dirs if d != directory])
+  return True
+
+# ---- static scan of one script
+
+def _call_name(node) -> str:
+  import ast
+
+  func = node.func
+  if isinstance(func, ast.Name):
+    return func.id
+  if isinstance(func, ast.Attribute):
+    return func.attr
+  return ""
+
+def scan_script(source, filename: str = "<script>"):
+  """{name, desc, version, commands} of a zzz script, None if the module builds no ZScript"""
+  import ast
+  from zzz.core.plugins import commands_of, _constant
+
+  tree = ast.parse(source, filename)
+  meta = None
+  for node in tree.body:
+    value = getattr(node, "value", None)
+    if isinstance(node, (ast.Assign, ast.AnnAssign)) and isinstance(value, ast.Call) and _call_name(value) == "ZScript":
+      meta = dict(zip(_SCRIPT_ARGS, map(_constant, value.args)))
+      meta.update({kw.arg: _constant(kw.value) for kw in value.keywords if kw.arg in _SCRIPT_ARGS})
+      break
+  if meta is None:
+    return None
+
+  desc = meta.get("desc") or ast.get_docstring(tree)
+  return {
+    "name": meta.get("name"),
+    "desc": desc.strip().splitlines()[0] if isinstance(desc, str) and desc.strip() else None,
+    "version": meta.get("version"),
+    "commands": [{"name": c["name"], "short": c["short"]} for c in commands_of(tree)],
+  }
+
+# ---- catalog
+
+class Catalog:
+  """
+  scripts: path - {name, desc, version, commands, mtime_ns, size}, in the
+  order of the configured directories (a name found twice: first wins)
+  """
+  def __init__(self, dirs=None):
+    self.dirs = script_dirs() if dirs is None else dirs
+    self.scripts = {}
+    self.changed = False
+
+  @classmethod
+  def load(cls, dirs=None) -> 'Catalog':
+    catalog = cls(dirs)
+    try:
+      with open(catalog_file(), "r") as file:
+        data = json.load(file)
+      if data.get("version") == CATALOG_VERSION:
+        catalog.scripts = data["scripts"]
+    except (OSError, ValueError, KeyError):
+      pass
+    return catalog
+
+  def save(self) -> None:
+    if not self.changed:
+      return
+    try:
+      os.makedirs(zzz_home(), exist_ok=True)
+      path = catalog_file()
+      tmp = f"{path}.{os.getpid()}.tmp"
+      with open(tmp, "w") as file:
+        json.dump({"version": CATALOG_VERSION, "scripts": self.scripts}, file)
+      os.replace(tmp, path)
+      self.changed = False
+    except OSError:
+      # only a cache
+      pass
+
+  def refresh(self) -> 'Catalog':
+    """Rescans the directories, parsing only new or changed files"""
+    old, scripts = self.scripts, {}
+    for directory in self.dirs:
+      try:
+        entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+      except OSError:
+        continue
+      for entry in entries:
+        if not entry.name.endswith(".py") or entry.name.startswith("_"):
+          continue
+        try:
+          stat = entry.stat()
+        except OSError:
+          continue
+        if not entry.is_file():
+          continue
+
+        info = old.get(entry.path)
+        if info is None or info["mtime_ns"] != stat.st_mtime_ns or info["size"] != stat.st_size:
+          info = self._scan(entry.path, stat)
+          self.changed = True
+        scripts[entry.path] = info
+
+    if scripts.keys() != old.keys():
+      self.changed = True
+    self.scripts = scripts
+    return self
+
+  @staticmethod
+  def _scan(path: str, stat) -> dict:
+    try:
+      with open(path, "rb") as file:
+        info = scan_script(file.read(), path)
+    except (OSError, SyntaxError, ValueError):
+      info = None
+    # not a zzz script (or broken): remembered so it is not parsed again
+    info = info or {"name": None, "desc": None, "version": None, "commands": None}
+    info.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    return info
+
+  def entries(self):
+    """(name, path, info) of the zzz scripts, first of a name only"""
+    seen = set()
+    for path, info in self.scripts.items():
+      if info["commands"] is None:
+        continue
+      name = os.path.basename(path)[:-3]
+      if name in seen:
+        continue
+      seen.add(name)
+      yield name, path, info
+
+  def find(self, name: str):
+    """Path of script `name` (file name without .py), None if unknown"""
+    for entry_name, path, _ in self.entries():
+      if entry_name == name:
+        return path
+    return None
+
+  def search(self, term: str):
+    term = term.lower()
+    for name, path, info in self.entries():
+      words = [name, info.get("desc") or ""]
+      for command in info["commands"]:
+        words += [command["name"], command.get("short") or ""]
+      if any(term in word.lower() for word in words):
+        yield name, path, info
+
+def load_catalog(refresh: bool = True) -> Catalog:
+  catalog = Catalog.load()
+  if refresh:
+    catalog.refresh().save()
+  return catalog
+
+def find_script(name: str):
+  """
+  Path of a catalog script without a rescan when the cached entry is still
+  valid, so `zzz <script> <command>` only stats the one file
+  """
+  catalog = Catalog.load()
+  path = catalog.find(name)
+  if path is not None:
+    info = catalog.scripts[path]
+    try:
+      stat = os.stat(path)
+      if stat.st_mtime_ns == info["mtime_ns"] and stat.st_size == info["size"]:
+        return path
+    except OSError:
+      pass
+  # unknown, moved or changed: rescan (changed files only) and look again
+  catalog.refresh().save()
+  return catalog.find(name)
@@ -0,0 +1,120 @@
+import time
+import bisect
+import threading
+
+
+# ---- prefix index
+
+class PrefixIndex:
+  """
+  Sorted words, a prefix lookup is two bisects instead of a startswith
+  over every word. Built once, rebuilt by the owner when its words change.
+  """
+  __slots__ = ("words",)
+
+  def __init__(self, words=()):
+    self.words = sorted(set(map(str, words)))
+
+  def match(self, prefix: str) -> list:
+    if not prefix:
+      return list(self.words)
+    start = bisect.bisect_left(self.words, prefix)
+    # every word starting with prefix sorts before prefix + the last code point
+    end = bisect.bisect_left(self.words, prefix + "\U0010ffff", start)
+    return self.words[start:end]
+
+  def __contains__(self, word) -> bool:
+    i = bisect.bisect_left(self.words, word)
+    return i < len(self.words) and self.words[i] == word
+
+  def __len__(self) -> int:
+    return len(self.words)
+
+class VersionedIndex:
+  """PrefixIndex of source(), rebuilt only when version() changes"""
+  def __init__(self, source, version):
+    self._source = source
+    self._version = version
+    self._built = None
+    self._index = None
+
+  @property
+  def index(self) -> PrefixIndex:
+    version = self._version()
+    if self._index is None or version != self._built:
+      self._index = PrefixIndex(self._source())
+      self._built = version
+    return self._index
+
+  def match(self, prefix: str) -> list:
+    return self.index.match(prefix)
+
+# ---- per argument completers (Arg(..., complete=fn))
+
+class ArgCompleter:
+  """
+  Values of an argument from a function (hostnames from an inventory, ...),
+  cached for `ttl` seconds. The function runs in a background thread:
+  the first TAB waits up to `wait` seconds for it (and shows nothing if it
+  is slower, the next TAB will), a stale list is served while it is
+  refreshed.
+
+    @script.on("ssh")
+    def ssh(host: Arg("host", complete=inventory_hosts, complete_ttl=300)):
+      ...
+  """
+  def __init__(self, func, ttl: float = 60, wait: float = 0.5):
+    self.func = func
+    self.ttl = ttl
+    self.wait = wait
+    self.error = None
+
+    self._index = None
+    self._loaded = 0.0
+    self._thread = None
+    self._lock = threading.Lock()
+
+  @property
+  def stale(self) -> bool:
+    return self._index is None or (self.ttl is not None and time.monotonic() - self._loaded > self.ttl)
+
+  def _load(self) -> None:
+    try:
+      index = PrefixIndex(self.func())
+    except Exception as e:
+      self.error = e
+    else:
+      self._index, self._loaded, self.error = index, time.monotonic(), None
+    finally:
+      # same lock as refresh(), or two callers could both start a load
+      with self._lock:
+        self._thread = None
+
+  def refresh(self) -> threading.Thread:
+    """Starts a background load unless one is running"""
+    with self._lock:
+      thread = self._thread
+      if thread is None:
+        thread = self._thread = threading.Thread(
+          target=self._load, name=f"zzz-complete-{getattr(self.func, '__name__', '')}", daemon=True
+        )
+        thread.start()
+      return thread
+
+  def complete(self, text: str) -> list:
+    if self.stale:
+      thread = self.refresh()
+      if self._index is None:
+        thread.join(self.wait)
+    index = self._index
+    return index.match(text) if index is not None else []
+
+  def cmd2_completer(self):
+    """completer= for a cmd2 argparser"""
+    def complete(app, text, line, begidx, endidx):
+      matches = self.complete(text)
+      if not matches and self.error is not None:
+        from cmd2 import CompletionError
+        raise CompletionError(f"completion failed: {self.error}")
+      return matches
+    return complete
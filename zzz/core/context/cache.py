@@ -0,0 +1,317 @@
+import os
+import sys
+import time
+import pickle
+import hashlib
+import threading
+import functools
+
+from pathlib import Path
+from collections import OrderedDict
+
+from zzz.utils.path import zzz_home
+
+
+# ---- result cache (script.cache)
+
+def cache_dir(script_path) -> Path:
+  # ScriptConfig.zzz_path / cache, without building the pydantic config;
+  # per script file, same named scripts in other directories do not share
+  path = os.path.abspath(script_path)
+  digest = hashlib.sha1(path.encode()).hexdigest()[:12]
+  return zzz_home() / "cache" / "results" / f"{Path(path).stem}-{digest}"
+
+def _size(value, blob) -> int:
+  return len(blob) if blob is not None else sys.getsizeof(value)
+
+def _code_digest(func) -> bytes:
+  """Digest of the function's code (bytecode, constants, names): an edit invalidates its entries"""
+  import marshal
+
+  code = getattr(func, "__code__", None)
+  if code is None:
+    return b""
+  try:
+    blob = marshal.dumps(code)
+  except ValueError:
+    blob = code.co_code
+  return hashlib.sha1(blob).digest()
+
+def _canonical(value):
+  """Equal arguments pickle the same: dicts and sets are sorted (by pickled form, mixed types sort too)"""
+  if isinstance(value, dict):
+    items = [(_canonical(k), _canonical(v)) for k, v in value.items()]
+    return ("dict", sorted(items, key=lambda item: pickle.dumps(item[0], protocol=4)))
+  if isinstance(value, (set, frozenset)):
+    return ("set", sorted((_canonical(v) for v in value), key=lambda v: pickle.dumps(v, protocol=4)))
+  if isinstance(value, list):
+    return ("list", [_canonical(v) for v in value])
+  if isinstance(value, tuple):
+    return ("tuple", [_canonical(v) for v in value])
+  return value
+
+class CachedFunction:
+  """
+  Memoizes a command / helper by its arguments. Arguments are bound to the
+  signature and defaults applied, so f(1), f(x=1) and f(1, y=2) with y=2
+  default are one entry. Keys include the function's code, editing it
+  starts from an empty cache.
+
+  Two tiers: an in process LRU (max_entries, max_bytes) and pickle files
+  on disk that outlive the process (cli runs, daemon forks, other
+  shells), with the same budget. Entries older than ttl seconds are
+  dropped on lookup, ttl None keeps them until evicted or invalidated.
+  Memory hits return the cached object itself, do not mutate it.
+  """
+  def __init__(self, func, directory: Path, ttl=None, max_entries: int = 128, max_bytes: int = 64 << 20, disk: bool = True):
+    self.func = func
+    self.name = func.__qualname__
+    self.ttl = ttl
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.directory = directory / self.name.replace("<", "").replace(">", "") if disk else None
+
+    self._sig = None
+    self._code = _code_digest(func)
+    self._memory = OrderedDict()  # key - (expires, size, value)
+    self._memory_bytes = 0
+    self._disk_usage = None       # [entries, bytes], counted on first disk write
+    self._lock = threading.Lock()
+
+    self.hits = 0
+    self.disk_hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.uncacheable = 0
+
+    functools.update_wrapper(self, func)
+
+  # ---- keys
+
+  def key(self, *args, **kwargs):
+    """Digest of the function's code and normalized arguments, None when they cannot be pickled"""
+    if self._sig is None:
+      import inspect
+      self._sig = inspect.signature(self.func)
+    bound = self._sig.bind(*args, **kwargs)
+    bound.apply_defaults()
+    # cmd2 adds its statement / handler when the function takes **kwargs
+    arguments = {k: v for k, v in bound.arguments.items() if not k.startswith("cmd2_")}
+    try:
+      blob = pickle.dumps(_canonical(arguments), protocol=4)
+    except Exception:
+      return None
+    return hashlib.sha1(self._code + blob).hexdigest()
+
+  # ---- calls
+
+  def __call__(self, *args, **kwargs):
+    key = self.key(*args, **kwargs)
+    if key is None:
+      self.uncacheable += 1
+      return self.func(*args, **kwargs)
+
+    now = time.time()
+    with self._lock:
+      entry = self._memory.get(key)
+      if entry is not None:
+        if entry[0] is None or entry[0] > now:
+          self._memory.move_to_end(key)
+          self.hits += 1
+          return entry[2]
+        self._drop(key)
+
+    entry = self._disk_load(key, now)
+    if entry is not None:
+      expires, value, blob = entry
+      with self._lock:
+        self.disk_hits += 1
+        self._remember(key, expires, value, blob)
+      return value
+
+    with self._lock:
+      self.misses += 1
+    value = self.func(*args, **kwargs)
+    expires = now + self.ttl if self.ttl is not None else None
+    try:
+      blob = pickle.dumps((expires, value), protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+      blob = None  # memory only
+    with self._lock:
+      self._remember(key, expires, value, blob)
+    if blob is not None:
+      self._disk_store(key, blob)
+    return value
+
+  def __get__(self, instance, owner):
+    # cached methods: bind like a function would
+    return self if instance is None else functools.partial(self, instance)
+
+  # ---- memory tier
+
+  def _remember(self, key, expires, value, blob) -> None:
+    size = _size(value, blob)
+    if size > self.max_bytes:
+      return
+    if key in self._memory:
+      self._drop(key)
+    self._memory[key] = (expires, size, value)
+    self._memory_bytes += size
+    while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+      self._drop(next(iter(self._memory)))
+      self.evictions += 1
+
+  def _drop(self, key) -> None:
+    _, size, _ = self._memory.pop(key)
+    self._memory_bytes -= size
+
+  # ---- disk tier
+
+  def _path(self, key) -> Path:
+    return self.directory / f"{key}.pickle"
+
+  def _disk_load(self, key, now):
+    """(expires, value, pickled entry) of a live entry, None if there is none"""
+    if self.directory is None:
+      return None
+    path = self._path(key)
+    try:
+      with open(path, "rb") as file:
+        blob = file.read()
+      expires, value = pickle.loads(blob)
+    except Exception:
+      # missing, truncated or a class that is gone
+      return None
+    if expires is not None and expires <= now:
+      self._unlink(path)
+      return None
+    return expires, value, blob
+
+  def _disk_store(self, key, blob) -> None:
+    if self.directory is None or len(blob) > self.max_bytes:
+      return
+    path = self._path(key)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+      self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+      with open(tmp, "wb") as file:
+        file.write(blob)
+      os.replace(tmp, path)
+    except OSError:
+      # no space / not writable: just not cached on disk
+      self._unlink(tmp)
+      return
+
+    with self._lock:
+      if self._disk_usage is None:
+        entries = self._disk_entries()
+        self._disk_usage = [len(entries), sum(size for _, size, _ in entries)]
+      else:
+        self._disk_usage[0] += 1
+        self._disk_usage[1] += len(blob)
+      count, total = self._disk_usage
+      if count > self.max_entries or total > self.max_bytes:
+        self._disk_evict()
+
+  def _disk_entries(self):
+    """(mtime, size, path) of the disk entries"""
+    entries = []
+    for path in self.directory.glob("*.pickle"):
+      try:
+        stat = path.stat()
+      except OSError:
+        continue
+      entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+  def _disk_evict(self) -> None:
+    entries = sorted(self._disk_entries())
+    total = sum(size for _, size, _ in entries)
+    count = len(entries)
+    for _, size, path in entries:
+      if total <= self.max_bytes and count <= self.max_entries:
+        break
+      self._unlink(path)
+      total -= size
+      count -= 1
+      self.evictions += 1
+    self._disk_usage = [count, total]
+
+  @staticmethod
+  def _unlink(path) -> None:
+    try:
+      os.unlink(path)
+    except OSError:
+      pass
+
+  # ---- invalidation / stats
+
+  def invalidate(self, *args, **kwargs) -> None:
+    """Drops the entry of these arguments"""
+    key = self.key(*args, **kwargs)
+    if key is None:
+      return
+    with self._lock:
+      if key in self._memory:
+        self._drop(key)
+    if self.directory is not None:
+      self._unlink(self._path(key))
+      self._disk_usage = None
+
+  def clear(self) -> None:
+    """Drops every entry, in memory and on disk"""
+    with self._lock:
+      self._memory.clear()
+      self._memory_bytes = 0
+      if self.directory is not None and self.directory.is_dir():
+        for path in self.directory.glob("*.pickle"):
+          self._unlink(path)
+      self._disk_usage = None
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.disk_hits + self.misses
+    disk = self._disk_entries() if self.directory is not None and self.directory.is_dir() else []
+    return {
+      "name": self.name,
+      "entries": len(self._memory),
+      "bytes": self._memory_bytes,
+      "disk_entries": len(disk),
+      "disk_bytes": sum(size for _, size, _ in disk),
+      "hits": self.hits,
+      "disk_hits": self.disk_hits,
+      "misses": self.misses,
+      "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else None,
+      "evictions": self.evictions,
+      "uncacheable": self.uncacheable,
+    }
+
+class ScriptCache:
+  """Every script.cache'd function of a script, for stats and invalidation"""
+  def __init__(self, script_path):
+    self.directory = cache_dir(script_path)
+    self._registers = {}
+
+  def __call__(self, ttl=None, max_entries: int = 128, max_bytes: int = 64 << 20, disk: bool = True):
+    def wrapper(func):
+      cached = CachedFunction(func, self.directory, ttl, max_entries, max_bytes, disk)
+      self._registers[cached.name] = cached
+      return cached
+    return wrapper
+
+  def items(self):
+    return self._registers.items()
+
+  def get(self, name, default=None):
+    return self._registers.get(name, default)
+
+  def stats(self):
+    return [cached.stats() for cached in self._registers.values()]
+
+  def clear(self, name: str = None) -> None:
+    """Clears one cached function (by name) or all"""
+    if name is not None:
+      if name not in self._registers:
+        raise KeyError(f"No cached function '{name}'")
+      return self._registers[name].clear()
+    for cached in self._registers.values():
+      cached.clear()
@@ -1,23 +1,124 @@
-import inspect
+import sys
+import argparse
 
-from cmd2 import Cmd2ArgumentParser
 
+# add_argument kwargs only understood by cmd2's argparse patches
+CMD2_ARG_KWARGS = {"choices_provider", "completer", "descriptive_header", "suppress_tab_hint"}
+
+def _parser_class(arguments):
+  # cmd2 parser is only needed once cmd2 is loaded (interactive runner)
+  # or when an Arg uses cmd2 features, plain argparse is enough for cli
+  if "cmd2" in sys.modules or any(
+    CMD2_ARG_KWARGS & kwargs.keys() or isinstance(kwargs.get("nargs"), tuple)
+    for _, kwargs in arguments
+  ):
+    from cmd2 import Cmd2ArgumentParser
+    return Cmd2ArgumentParser
+  return argparse.ArgumentParser
+
+# Arg kwargs handled by zzz itself, never passed to add_argument
+ZZZ_ARG_KWARGS = ("complete", "complete_ttl")
 
 class Arg:
+  """
+  add_argument(*args, **kwargs) of a parameter, plus:
+    complete=fn        values for tab completion (fn() -> iterable), see ArgCompleter
+    complete_ttl=secs  how long fn's values are reused (default 60, None: forever)
+  """
   def __init__(self, *args, **kwargs):
     self.args = args
     self.kwargs = kwargs
 
+# default of a CallPlan positional without one
+_REQUIRED = object()
+
+# Binding of parsed args to the function, worked out once from the signature
+class CallPlan:
+  __slots__ = ("positional", "keywords", "varargs", "params", "var_keyword")
+
+  def __init__(self, sig):
+    import inspect
+
+    params = sig.parameters.values()
+    self.positional = []  # (name, default or _REQUIRED) passed positionally, in signature order
+    self.keywords = []    # passed by keyword
+    self.varargs = None   # *args name
+    self.params = frozenset(sig.parameters)
+    self.var_keyword = False  # **kwargs takes every unmatched arg
+
+    # with *args every parameter before it must be positional, a keyword
+    # one would be filled twice: echo(text, count=1, *rest) with `a b c`
+    has_varargs = any(param.kind == inspect.Parameter.VAR_POSITIONAL for param in params)
+
+    for param in params:
+      if param.kind == inspect.Parameter.VAR_POSITIONAL:
+        self.varargs = param.name
+      elif param.kind == inspect.Parameter.VAR_KEYWORD:
+        self.var_keyword = True
+      elif param.kind == inspect.Parameter.KEYWORD_ONLY:
+        self.keywords.append(param.name)
+      elif (
+        param.kind == inspect.Parameter.POSITIONAL_ONLY
+        or param.default is inspect.Parameter.empty
+        or has_varargs
+      ):
+        default = _REQUIRED if param.default is inspect.Parameter.empty else param.default
+        self.positional.append((param.name, default))
+      else:
+        self.keywords.append(param.name)
+
+  def call(self, func, arg_dict):
+    # a parameter the parser did not fill takes its default
+    positional = [
+      arg_dict[name] if name in arg_dict else default
+      for name, default in self.positional
+      if name in arg_dict or default is not _REQUIRED
+    ]
+    keywords = {name: arg_dict[name] for name in self.keywords if name in arg_dict}
+
+    if self.varargs is not None:
+      positional.extend(arg_dict.get(self.varargs, []))
+
+    if self.var_keyword:
+      params = self.params
+      for k, v in arg_dict.items():
+        if k not in params:
+          keywords[k] = v
+
+    return func(*positional, **keywords)
+
+# Registration only keeps this metadata, the signature is walked and the
+# parser built the first time the command is run, completed or asked for help
 class ScriptCommand:
-  def __init__(self, name, func, short=None, desc=None):
+  __slots__ = ("name", "func", "short", "desc", "executor", "worker_key", "_arguments", "_argparser", "_plan", "_completers")
+
+  # None runs in the calling thread, "process" in the shared process pool
+  EXECUTORS = (None, "process")
+  # plugin stand-ins (zzz.core.plugins.LazyCommand) are lazy
+  lazy = False
+
+  def __init__(self, name, func, short=None, desc=None, executor=None, script=None):
+    if executor not in self.EXECUTORS:
+      raise Exception(f"Command '{name}' has unknown executor '{executor}'")
+
     self.name = name
     self.func = func # callable
     # Short description
     self.short = short
-    
-    self.argparser = Cmd2ArgumentParser(prog=self.name)
-    # parse args from function
-    self._parse_func_args()
+    self.executor = executor
+    # (script file, name at registration): same named commands of other
+    # scripts / plugins and plugin prefixes do not mix up in the workers
+    self.worker_key = (script, name)
+    if executor == "process":
+      from .worker import register
+      register(self)
+
+    # (args, kwargs) for add_argument and CallPlan, filled by _parse_func_args
+    self._arguments = None
+    self._argparser = None
+    self._plan = None
+    # index in _arguments - ArgCompleter
+    self._completers = {}
 
     # if desc or get from func desc
     self.desc = desc or self.func.__doc__
@@ -28,13 +129,43 @@ class ScriptCommand:
   def get(self, name, default=None):
     return self._registers.get(name, default)
 
+  @property
+  def arguments(self):
+    if self._arguments is None:
+      self._parse_func_args()
+    return self._arguments
+
+  @property
+  def plan(self):
+    if self._plan is None:
+      self._parse_func_args()
+    return self._plan
+
+  @property
+  def argparser(self):
+    if self._argparser is None:
+      arguments = self.arguments
+      self._argparser = _parser_class(arguments)(prog=self.name)
+      # completers are only wired into cmd2 parsers (interactive runner)
+      completers = self._completers if "cmd2" in sys.modules else {}
+      for i, (args, kwargs) in enumerate(arguments):
+        if i in completers:
+          kwargs = {**kwargs, "completer": completers[i].cmd2_completer()}
+        self._argparser.add_argument(*args, **kwargs)
+    return self._argparser
+
   def help_text(self, line):
     return self.desc or self.argparser.format_help()
 
   # Building argparse
   def _parse_func_args(self):
+    # inspect is heavy to import, only pay for it when a command is used
+    import inspect
+
     sig = inspect.signature(self.func)
-  
+    self._arguments = []
+    self._plan = CallPlan(sig)
+
     for param_name, param in sig.parameters.items():
       # Handle *args and **kwargs
       if param.kind == inspect.Parameter.VAR_POSITIONAL:
@@ -61,62 +192,62 @@ class ScriptCommand:
       else:
         # optional argument
         self._add_argument(f"--{param_name}", type=arg_type, default=default)
+
   def _add_argument(self, *args, **kwargs):
-    self.argparser.add_argument(*args, **kwargs)
+    if kwargs.get("complete") is not None:
+      from zzz.core.completion import ArgCompleter
+      self._completers[len(self._arguments)] = ArgCompleter(kwargs["complete"], kwargs.get("complete_ttl", 60))
+    kwargs = {k: v for k, v in kwargs.items() if k not in ZZZ_ARG_KWARGS}
+    self._arguments.append((args, kwargs))
 
   def emit_func(self, *args, **kwargs):
     return self.func(*args, **kwargs) if callable(self.func) else self.func
   
-  # args will be cmd2 Namespace()
+  # args will be cmd2 Namespace() or a dict
   def run(self, args):
-    import inspect
+    arg_dict = args if isinstance(args, dict) else vars(args)
+    if self.executor == "process":
+      return self.submit(arg_dict).result()
+    return self.plan.call(self.func, arg_dict)
 
-    # Convert argparse Namespace to dict
-    if not isinstance(args, dict):
-      arg_dict = vars(args)
-    else:
-      arg_dict = args
-
-    sig = inspect.signature(self.func)
-    positional = []
-    keywords = {}
-    varargs = []
-    extra_kwargs = {}
-
-    for name, param in sig.parameters.items():
-      if param.kind == inspect.Parameter.VAR_POSITIONAL:
-        # collect *args
-        varargs = arg_dict.get(name, [])
-      elif param.kind == inspect.Parameter.VAR_KEYWORD:
-        # collect remaining kwargs not already matched
-        for k, v in arg_dict.items():
-          if k not in sig.parameters:
-            extra_kwargs[k] = v
-      else:
-        # normal positional or keyword parameters
-        if name in arg_dict:
-          if param.default is inspect._empty:
-            # no default → positional
-            positional.append(arg_dict[name])
-          else:
-            # has default → keyword
-            keywords[name] = arg_dict[name]
-
-    # Call the function
-    return self.func(*positional, *varargs, **keywords, **extra_kwargs)
+  def submit(self, args):
+    """Runs in the process pool, returns a concurrent.futures.Future"""
+    from .worker import submit
+    return submit(self, args if isinstance(args, dict) else vars(args))
 
   def run_cli(self, args):
     return self.run(self.argparser.parse_args(args))
 
 class ScriptCommands:
-  def __init__(self):
+  def __init__(self, script: str = None):
+    # file of the owning script, see ScriptCommand.worker_key
+    self.script = script
     self._registers = {}
+    # bumped on every add, completion indexes rebuild when it changes
+    self.version = 0
   
   def items(self):
     return self._registers.items()
   
+  def has(self, name) -> bool:
+    """Registered (plugin commands included), without importing a plugin"""
+    return name in self._registers
+
   def get(self, name, default=None):
-    return self._registers.get(name, default)
+    command = self._registers.get(name, default)
+    if command is not None and command.lazy:
+      # plugin command: import its module now
+      command = command.resolve(self._registers)
+      self.version += 1
+    return command
 
   def add(self, name, func, *args, **kwargs):
-    self._registers[name] = ScriptCommand(name, func, *args, **kwargs)
+    self._registers[name] = ScriptCommand(name, func, *args, script=self.script, **kwargs)
+    self.version += 1
+
+  def add_lazy(self, command) -> None:
+    """Registers a plugin stand-in, commands of the script itself win over it"""
+    current = self._registers.get(command.name)
+    if current is None or current.lazy:
+      self._registers[command.name] = command
+      self.version += 1
@@ -0,0 +1,209 @@
+import time
+import threading
+
+
+# ---- progress bars (script.progress)
+
+class ProgressBar:
+  """
+  Counter behind script.progress(): advance() only adds to a number, the
+  live view reads it at its own capped frame rate, so per item updates
+  cost next to nothing (and nothing is drawn when stdout is not a tty).
+
+    for host in script.progress(hosts, description="scan"):
+      ...
+
+    with script.progress(total=size, description="copy") as bar:
+      bar.advance(len(chunk))
+  """
+  def __init__(self, view, iterable=None, total=None, description: str = ""):
+    if total is None and iterable is not None:
+      try:
+        total = len(iterable)
+      except TypeError:
+        pass
+
+    self.view = view
+    self.iterable = iterable
+    self.total = total
+    self.completed = 0
+    self.description = description
+    self.started = time.monotonic()
+    self.finished = None
+
+  @property
+  def done(self) -> bool:
+    return self.finished is not None
+
+  @property
+  def elapsed(self) -> float:
+    return (self.finished or time.monotonic()) - self.started
+
+  @property
+  def fraction(self):
+    """0..1, None without a total"""
+    if not self.total:
+      return None
+    return min(1.0, self.completed / self.total)
+
+  @property
+  def eta(self):
+    """Seconds left at the current rate, None if unknown"""
+    if not self.total or not self.completed:
+      return None
+    return max(0.0, (self.total - self.completed) * self.elapsed / self.completed)
+
+  def advance(self, n: int = 1) -> None:
+    self.completed += n
+
+  def update(self, completed: int = None, total: int = None, description: str = None) -> None:
+    if completed is not None:
+      self.completed = completed
+    if total is not None:
+      self.total = total
+    if description is not None:
+      self.description = description
+
+  def close(self) -> None:
+    if self.finished is None:
+      self.finished = time.monotonic()
+      self.view._closed(self)
+
+  def __enter__(self) -> 'ProgressBar':
+    return self
+
+  def __exit__(self, *args) -> None:
+    self.close()
+
+  def __iter__(self):
+    if self.iterable is None:
+      raise TypeError("progress(total=...) is not iterable, use advance() / update() or pass an iterable")
+    return self._iterate()
+
+  def _iterate(self):
+    # an exception in the loop body does not reach here, the runner closes
+    # what a command left open (ScriptProgress.close_all)
+    try:
+      for item in self.iterable:
+        yield item
+        self.completed += 1
+    finally:
+      self.close()
+
+  def __str__(self) -> str:
+    counts = f"{self.completed}/{self.total}" if self.total else str(self.completed)
+    fraction = self.fraction
+    percent = f"{fraction * 100:.0f}% " if fraction is not None else ""
+    return f"{self.description + ' ' if self.description else ''}{percent}({counts})"
+
+def _format_seconds(seconds) -> str:
+  if seconds is None:
+    return "-:--"
+  minutes, seconds = divmod(int(seconds), 60)
+  hours, minutes = divmod(minutes, 60)
+  return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def render_bars(rows):
+  """rows: (label, ProgressBar or None) -> rich renderable, one line per row"""
+  from rich.table import Table
+  from rich.progress_bar import ProgressBar as Bar
+
+  grid = Table.grid(padding=(0, 1))
+  for _ in range(5):
+    grid.add_column(no_wrap=True)
+  for label, bar in rows:
+    if bar is None:
+      grid.add_row(label, "", "", "", "")
+      continue
+    fraction = bar.fraction
+    grid.add_row(
+      label,
+      Bar(total=bar.total or None, completed=bar.completed, width=30, animation_time=time.monotonic()),
+      f"{bar.completed}/{bar.total}" if bar.total else str(bar.completed),
+      f"{fraction * 100:3.0f}%" if fraction is not None else "",
+      f"[dim]{_format_seconds(bar.elapsed)} eta {_format_seconds(None if bar.done else bar.eta)}[/dim]",
+    )
+  return grid
+
+# ---- live view
+
+class ScriptProgress:
+  """
+  One live view for the script's progress bars, redrawn at most `fps`
+  times per second by rich's refresh thread. Bars created inside a
+  background job are attached to the job instead (see `jobs`), the prompt
+  owns the terminal there.
+  """
+  fps = 10
+
+  def __init__(self, script):
+    self.script = script
+    self._bars = []
+    self._live = None
+    self._lock = threading.Lock()
+
+  def _current_task(self):
+    # no ScriptTasks built -> no background jobs
+    tasks = self.script.__dict__.get("tasks")
+    return tasks.current() if tasks is not None else None
+
+  def bar(self, iterable=None, total=None, description: str = "") -> ProgressBar:
+    bar = ProgressBar(self, iterable, total, description)
+
+    task = self._current_task()
+    if task is not None:
+      task.progress = bar
+      return bar
+    scr = self.script.scr
+    if not scr.is_terminal or scr.output_mode:
+      return bar
+
+    with self._lock:
+      self._bars.append(bar)
+      if self._live is None:
+        from rich.live import Live
+
+        self.script.scr.sync()
+        self._live = Live(
+          get_renderable=self._render,
+          console=self.script.scr,
+          refresh_per_second=self.fps,
+        )
+        self._live.start()
+    return bar
+
+  def _render(self):
+    return render_bars([(bar.description, bar) for bar in list(self._bars)])
+
+  def close_all(self) -> None:
+    """Closes the bars left open (loop left by an exception, progress(total=) never closed)"""
+    for bar in list(self._bars):
+      bar.close()
+
+  def _closed(self, bar) -> None:
+    with self._lock:
+      if self._live is None or not all(bar.done for bar in self._bars):
+        return
+      # last one done: draw the final state and leave it on screen
+      live, self._live = self._live, None
+      live.stop()
+      self._bars = []
+
+def watch_tasks(console, tasks, fps: int = ScriptProgress.fps) -> None:
+  """Live table of running jobs and their progress until all are done (Ctrl+C stops watching)"""
+  from rich.live import Live
+
+  def render():
+    rows = []
+    for id, task in list(tasks.items()):
+      label = f"[blue][{id}][/blue] {task.status:<9} {task.name}"
+      rows.append((label, task.progress))
+    return render_bars(rows)
+
+  console.sync()
+  try:
+    with Live(get_renderable=render, console=console, refresh_per_second=fps):
+      while any(not task.done for _, task in list(tasks.items())):
+        time.sleep(1 / fps)
+  except KeyboardInterrupt:
+    console.print()
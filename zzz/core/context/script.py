@@ -1,17 +1,12 @@
 import os
 import sys
-import cmd2
-import inspect
 
-from uuid import uuid4
 from pathlib import Path
+from functools import cached_property
 
 from zzz.modules.process import sh
-from zzz.utils.path import ensure_dir
-from zzz.modules.console import AdvConsole
-from zzz.core.models.script import ScriptConfigModel
+from zzz.utils.path import ensure_dir, zzz_home
 
-from .task import ScriptTasks
 from .command import ScriptCommands, Arg
 
 
@@ -46,9 +41,9 @@ class ScriptEvents:
 # ---- Config and ZOptions
 
 class ScriptConfig:
-  def __init__(self, config: ScriptConfigModel):
+  def __init__(self, config):
     self._config = config
-    self.zzz_path = ensure_dir(Path.home() / ".zzz")
+    self.zzz_path = ensure_dir(zzz_home())
 
 class ScriptOption:
   def __init__(self, name, value=None, require=False, _type=str, choices=()):
@@ -103,10 +98,13 @@ class ScriptOption:
 class ScriptOptions:
   def __init__(self):
     self._options = {}
+    # bumped on every add, completion indexes rebuild when it changes
+    self.version = 0
   
   def add(self, name, *args, **kwargs):
     option = ScriptOption(name, *args, **kwargs)
     self._options[name] = option
+    self.version += 1
     return option
   
   # sets option else raises error
@@ -144,31 +142,109 @@ class ScriptArgs:
 class ZScript:
   prompt = "| "
   banner = None
+  # seconds a resident daemon (--zzz-daemon) waits for clients before exiting
+  daemon_idle = 900
+  # None (rich) or "json" / "jsonl" / "plain", see set_output / --output
+  output = None
   def __init__(self, name=None, version=None, author=None, desc=None, config={}):
-    # script paths
-    self.script_full_path = Path(sys.argv[0])
+    from zzz.core.runner import LOADING_PLUGIN
+
+    # script paths, a plugin's script is its own file, not the host's
+    source = LOADING_PLUGIN or sys.argv[0]
+    self.script_full_path = Path(source)
     self.script_path = self.script_full_path.parent
     
     # with ext
-    self.script_name = os.path.basename(sys.argv[0])
+    self.script_name = os.path.basename(source)
     # script meta
-    self.name = (name or Path(sys.argv[0]).with_suffix("").name).capitalize()
+    self.name = (name or Path(source).with_suffix("").name).capitalize()
     self.desc = desc
     self.author = author
     self.version = version
 
-    self.scr = AdvConsole()
-    self.options = ScriptOptions()
-    self.config = ScriptConfig(ScriptConfigModel(**config))
+    # scr, config and tasks are built on first access (see properties below)
+    self._config = config
 
+    self.options = ScriptOptions()
     self.events = ScriptEvents()
-    self.commands = ScriptCommands()
-    self.tasks = ScriptTasks()
+    self.commands = ScriptCommands(os.path.abspath(source))
 
     self.sh = sh
     # finally parsing args
     self.args = ScriptArgs()
 
+  # ---- lazy parts, cli runs that never touch them skip rich / pydantic / ~/.zzz
+
+  @cached_property
+  def scr(self):
+    from zzz.modules.console import AdvConsole
+    console = AdvConsole()
+    if self.output:
+      console.set_output(self.output)
+    return console
+
+  def set_output(self, mode: str = None) -> None:
+    """Machine readable output: tables, lists, panels and command results as json / jsonl / plain records"""
+    if mode is not None and mode != "rich":
+      from zzz.modules.output import OUTPUT_MODES
+      if mode not in OUTPUT_MODES:
+        raise ValueError(f"unknown output mode '{mode}', use one of: {', '.join(OUTPUT_MODES)}")
+    self.output = None if mode == "rich" else mode
+    if "scr" in self.__dict__:
+      self.scr.set_output(self.output)
+
+  @cached_property
+  def config(self):
+    from zzz.core.models.script import ScriptConfigModel
+    return ScriptConfig(ScriptConfigModel(**self._config))
+
+  @cached_property
+  def tasks(self):
+    from .task import ScriptTasks
+    return ScriptTasks()
+
+  @cached_property
+  def progress_view(self):
+    from .progress import ScriptProgress
+    return ScriptProgress(self)
+
+  def progress(self, iterable=None, total: int = None, description: str = ""):
+    """Progress bar (or wraps an iterable), live on a terminal, see ProgressBar"""
+    return self.progress_view.bar(iterable, total, description)
+
+  @cached_property
+  def caches(self):
+    from .cache import ScriptCache
+    return ScriptCache(self.script_full_path)
+
+  def cache(self, ttl: float = None, max_entries: int = 128, max_bytes: int = 64 << 20, disk: bool = True):
+    """
+    Caches a command's / helper's result by its arguments, see CachedFunction
+
+      @script.on("cost")
+      @script.cache(ttl=3600)
+      def cost(account, month="current"):
+        ...
+
+    cost.invalidate(account) drops one entry, cost.clear() all of them.
+    """
+    return self.caches(ttl, max_entries, max_bytes, disk)
+
+  @cached_property
+  def ash(self):
+    from zzz.modules.async_process import ash
+    return ash
+
+  # opt-in long-lived shell, see ShellSession
+  @cached_property
+  def session(self):
+    import atexit
+    from zzz.modules.session import ShellSession
+
+    session = ShellSession()
+    atexit.register(session.close)
+    return session
+
   @property
   def cwd(self):
     return os.getcwd()
@@ -187,6 +263,26 @@ class ZScript:
         self.commands.add(name, func, *args, **kwargs)
     return wrapper
 
+  def add_plugins(self, package: str = None, path=None, entry_points: str = None, prefix: str = ""):
+    """
+    Registers the commands of plugin modules without importing them: every
+    module of a package, every .py file of a directory (relative to the
+    script) or every module of an entry point group. A module is imported
+    when one of its commands is first run or completed, see zzz.core.plugins.
+
+      script.add_plugins(path="tools")
+      script.add_plugins(package="ops.commands", prefix="ops-")
+      script.add_plugins(entry_points="ops.zzz_commands")
+    """
+    from zzz.core.plugins import discover
+
+    if path is not None and not Path(path).is_absolute():
+      path = self.script_path / path
+    commands = discover(package=package, path=path, entry_points=entry_points, prefix=prefix)
+    for command in commands:
+      self.commands.add_lazy(command)
+    return [command.name for command in commands]
+
   def on_event(self, name, *args, **kwargs):
     def wrapper(func):
       self.events.add(name, func, *args, **kwargs)
@@ -1,13 +1,224 @@
+import io
+import sys
+import time
+import threading
+import itertools
+
 from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+
+# ---- per task output
+
+class TaskOutput:
+  """Output of a task, buffered while in background, written through when attached (fg)"""
+  def __init__(self):
+    self._buffer = io.StringIO()
+    self._target = None
+    self._lock = threading.Lock()
+
+  def write(self, text: str) -> int:
+    with self._lock:
+      if self._target is not None:
+        return self._target.write(text)
+      return self._buffer.write(text)
+
+  def flush(self) -> None:
+    target = self._target
+    if target is not None:
+      target.flush()
+
+  def isatty(self) -> bool:
+    # keep colors, output is replayed to the terminal later
+    return _terminal().isatty()
+
+  @property
+  def encoding(self) -> str:
+    return getattr(_terminal(), "encoding", "utf-8")
+
+  def attach(self, target) -> None:
+    """Replays buffered output to target and writes through from now on"""
+    if isinstance(target, StreamRouter):
+      # the router would send task writes right back here
+      target = target._stream
+    with self._lock:
+      target.write(self._buffer.getvalue())
+      self._buffer = io.StringIO()
+      self._target = target
+    target.flush()
+
+  def detach(self) -> None:
+    with self._lock:
+      self._target = None
+
+  def getvalue(self) -> str:
+    with self._lock:
+      return self._buffer.getvalue()
+
+class StreamRouter:
+  """
+  Installed as sys.stdout / sys.stderr once tasks are used, writes from a
+  task thread go to that task's output, everything else to the real stream
+  """
+  def __init__(self, stream):
+    self._stream = stream
+    self._local = threading.local()
+
+  @property
+  def target(self):
+    return getattr(self._local, "target", None) or self._stream
+
+  def route(self, target) -> None:
+    self._local.target = target
+
+  def write(self, text: str) -> int:
+    return self.target.write(text)
+
+  def flush(self) -> None:
+    self.target.flush()
+
+  def isatty(self) -> bool:
+    return self.target.isatty()
+
+  def __getattr__(self, name):
+    # fileno, encoding, buffer, ...
+    return getattr(self._stream, name)
+
+def _terminal():
+  stdout = sys.stdout
+  return stdout._stream if isinstance(stdout, StreamRouter) else stdout
 
+def _install_routers():
+  if not isinstance(sys.stdout, StreamRouter):
+    sys.stdout = StreamRouter(sys.stdout)
+  if not isinstance(sys.stderr, StreamRouter):
+    sys.stderr = StreamRouter(sys.stderr)
+  return sys.stdout, sys.stderr
+
+# ---- tasks
 
 class ScriptTask:
-  def __init__(self, name):
+  def __init__(self, name, id=None):
     self.uid = uuid4().hex
+    self.id = id  # short id shown at the prompt
     self.name = name
 
+    self.output = TaskOutput()
+    self.future = None
+    self.started = None
+    self.finished = None
+    # cancel() sets it, long running functions should check `cancelled`
+    self.cancel_event = threading.Event()
+    # finish was reported to the user
+    self.notified = False
+    # last script.progress() bar created in this task
+    self.progress = None
+
+  @property
+  def cancelled(self) -> bool:
+    return self.cancel_event.is_set()
+
+  @property
+  def done(self) -> bool:
+    return self.future is not None and self.future.done()
+
+  @property
+  def status(self) -> str:
+    if self.future is None or (not self.done and self.started is None):
+      return "cancelling" if self.cancelled else "pending"
+    if not self.done:
+      return "cancelling" if self.cancelled else "running"
+    if self.future.cancelled():
+      return "cancelled"
+    return "failed" if self.future.exception() is not None else "done"
+
+  @property
+  def elapsed(self) -> float:
+    if self.started is None:
+      return 0.0
+    return (self.finished or time.time()) - self.started
+
+  def cancel(self) -> bool:
+    """Cancels a pending task, running ones are asked to stop through cancel_event"""
+    self.cancel_event.set()
+    return self.future.cancel() if self.future is not None else False
+
+  def wait(self, timeout: float = None):
+    """Waits for the task, returns its result (raises its exception)"""
+    try:
+      return self.future.result(timeout)
+    except CancelledError:
+      return None
+
 class ScriptTasks:
-  def __init__(self):
+  def __init__(self, workers: int = None):
     # taskID - Task
     self._active = {}
+    self._workers = workers
+    self._pool = None
+    self._ids = itertools.count(1)
+    self._local = threading.local()
+    self._lock = threading.Lock()
+    self._routers = ()
+
+  @property
+  def pool(self) -> ThreadPoolExecutor:
+    if self._pool is None:
+      self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="zzz-task")
+    return self._pool
+
+  def submit(self, name, func, *args, **kwargs) -> ScriptTask:
+    """Runs func in the task pool, its stdout / stderr are captured per task"""
+    self._routers = _install_routers()
+
+    with self._lock:
+      task = ScriptTask(name, next(self._ids))
+      self._active[task.id] = task
+    task.future = self.pool.submit(self._run, task, func, args, kwargs)
+    return task
+
+  def _run(self, task, func, args, kwargs):
+    if task.cancelled:
+      return None
+
+    self._local.task = task
+    for router in self._routers:
+      router.route(task.output)
+    task.started = time.time()
+    try:
+      return func(*args, **kwargs)
+    finally:
+      task.finished = time.time()
+      for router in self._routers:
+        router.route(None)
+      self._local.task = None
+
+  def current(self):
+    """Task running in this thread, None outside of tasks"""
+    return getattr(self._local, "task", None)
+
+  def get(self, id, default=None):
+    try:
+      return self._active.get(int(id), default)
+    except (TypeError, ValueError):
+      # full uid
+      return next((task for task in self._active.values() if task.uid == id), default)
+
+  def remove(self, id) -> None:
+    self._active.pop(getattr(id, "id", id), None)
+
+  def items(self):
+    return self._active.items()
+
+  def finished_unnotified(self):
+    for task in list(self._active.values()):
+      if task.done and not task.notified:
+        task.notified = True
+        yield task
 
+  def shutdown(self, wait: bool = False) -> None:
+    for task in self._active.values():
+      # queued tasks never start (by hand, cancel_futures is python 3.9+)
+      task.cancel()
+    if self._pool is not None:
+      self._pool.shutdown(wait=wait)
@@ -0,0 +1,103 @@
+import os
+import sys
+import multiprocessing
+
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from zzz.core.runner import WORKER_ENV
+
+
+# Process pool for commands registered with executor="process".
+# Workers are forked after the script module is imported, so they start
+# warm with every command already registered (spawn platforms re-import
+# the script once per worker instead).
+
+# ScriptCommand.worker_key (script file, command name) - ScriptCommand,
+# filled at registration, inherited by fork
+_COMMANDS = {}
+_POOL = None
+# futures submitted to the pool and not done yet, cancelled on shutdown
+_PENDING = set()
+# set by one-shot cli calls: process commands run in the calling process
+_INLINE = False
+
+def register(command) -> None:
+  _COMMANDS[command.worker_key] = command
+
+def _start_method() -> str:
+  return "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+
+def _init_spawned(script_path: str) -> None:
+  # re-run the script (not as __main__) so its commands register again
+  import runpy
+
+  os.environ[WORKER_ENV] = "1"
+  runpy.run_path(script_path, run_name="__zzz_worker__")
+
+def _warm():
+  return os.getpid()
+
+def _call(key: tuple, arg_dict: dict):
+  command = _COMMANDS.get(key)
+  if command is None:
+    # a plugin command, its module was imported after this worker started
+    from zzz.core.plugins import load_plugin
+    load_plugin(key[0])
+    command = _COMMANDS[key]
+  return command.plan.call(command.func, arg_dict)
+
+def process_pool(workers: int = None) -> ProcessPoolExecutor:
+  """Shared pool, created (and its workers pre-started) on first use"""
+  global _POOL
+  if _POOL is None:
+    method = _start_method()
+    kwargs = {}
+    if method == "spawn":
+      kwargs = dict(initializer=_init_spawned, initargs=(os.path.abspath(sys.argv[0]),))
+
+    workers = workers or os.cpu_count() or 1
+    _POOL = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(method), **kwargs)
+    # start every worker now, not on the first real job
+    for future in [_POOL.submit(_warm) for _ in range(workers)]:
+      future.result()
+  return _POOL
+
+def has_process_commands() -> bool:
+  return bool(_COMMANDS)
+
+def set_inline(inline: bool = True) -> None:
+  """
+  Runs process commands in the calling process instead of the pool. A cli
+  call runs one command and exits, forking and warming cpu_count workers
+  for that single job costs more than it saves. Interactive, --batch and
+  daemon runs keep the pool.
+  """
+  global _INLINE
+  _INLINE = inline
+
+def _run_inline(command, arg_dict: dict) -> Future:
+  future = Future()
+  try:
+    future.set_result(command.plan.call(command.func, arg_dict))
+  except Exception as e:
+    future.set_exception(e)
+  return future
+
+def submit(command, arg_dict: dict):
+  # cmd2 adds its statement / handler to the namespace, they stay here
+  arg_dict = {k: v for k, v in arg_dict.items() if not k.startswith("cmd2_")}
+  if _INLINE:
+    return _run_inline(command, arg_dict)
+  future = process_pool().submit(_call, command.worker_key, arg_dict)
+  _PENDING.add(future)
+  future.add_done_callback(_PENDING.discard)
+  return future
+
+def shutdown(wait: bool = True) -> None:
+  global _POOL
+  if _POOL is not None:
+    # queued jobs never start (by hand, cancel_futures is python 3.9+)
+    for future in list(_PENDING):
+      future.cancel()
+    _POOL.shutdown(wait=wait)
+    _POOL = None
@@ -0,0 +1,285 @@
+import os
+import json
+import hashlib
+
+from pathlib import Path
+from functools import cached_property
+
+from zzz.utils.path import zzz_home
+
+
+# Manifest: everything help and completion need (commands, args, options)
+# stored in ~/.zzz/manifests keyed by script path and mtime, so they can be
+# served without importing the script module
+MANIFEST_VERSION = 1
+
+# argparse kwargs that survive json as is
+_ARG_KEYS = ("help", "metavar", "required", "dest")
+_VALUE_ACTIONS = (None, "store", "append", "extend")
+
+
+def manifests_dir() -> Path:
+  return zzz_home() / "manifests"
+
+def _script_digest(script_path: str) -> str:
+  return hashlib.sha1(script_path.encode()).hexdigest()[:16]
+
+def manifest_file(script_path):
+  """Manifest path for the current mtime of script, None if script is not a file"""
+  script_path = os.path.abspath(script_path)
+  try:
+    mtime = os.stat(script_path).st_mtime_ns
+  except OSError:
+    return None
+  return manifests_dir() / f"{_script_digest(script_path)}-{mtime}.json"
+
+
+def _jsonable(value):
+  return value is None or isinstance(value, (str, int, float, bool))
+
+def _arg_spec(args, kwargs):
+  spec = {"args": list(args)}
+
+  for key in _ARG_KEYS:
+    if key in kwargs and _jsonable(kwargs[key]):
+      spec[key] = kwargs[key]
+
+  action = kwargs.get("action")
+  spec["action"] = action if isinstance(action, str) or action is None else "store"
+
+  nargs = kwargs.get("nargs")
+  if isinstance(nargs, (str, int)):
+    spec["nargs"] = nargs
+
+  if kwargs.get("choices"):
+    spec["choices"] = [str(c) for c in kwargs["choices"]]
+
+  if _jsonable(kwargs.get("default")):
+    spec["default"] = kwargs.get("default")
+
+  arg_type = kwargs.get("type")
+  if arg_type is not None:
+    spec["type"] = getattr(arg_type, "__name__", str(arg_type))
+
+  return spec
+
+def build_manifest(script) -> dict:
+  script_path = os.path.abspath(script.script_full_path)
+  commands = {}
+  for name, command in script.commands.items():
+    commands[name] = {
+      "short": command.short,
+      "desc": command.desc,
+      # plugin commands not loaded yet: name and description only
+      "args": [] if command.lazy else [_arg_spec(args, kwargs) for args, kwargs in command.arguments],
+    }
+
+  options = {}
+  for name, opt in script.options._options.items():
+    options[name] = {
+      "type": getattr(opt._type, "__name__", str(opt._type)),
+      "choices": [str(c) for c in opt.choices],
+      "require": opt.require,
+    }
+
+  return {
+    "version": MANIFEST_VERSION,
+    "script": script_path,
+    "mtime_ns": os.stat(script_path).st_mtime_ns,
+    "name": script.name,
+    "script_name": script.script_name,
+    "desc": script.desc,
+    "author": script.author,
+    "script_version": script.version,
+    "commands": commands,
+    "options": options,
+  }
+
+def write_manifest(script, path=None) -> Path:
+  path = path or manifest_file(script.script_full_path)
+  path.parent.mkdir(parents=True, exist_ok=True)
+
+  # atomic write, completion may read it at any time
+  tmp = path.with_suffix(f".{os.getpid()}.tmp")
+  tmp.write_text(json.dumps(build_manifest(script)))
+  os.replace(tmp, path)
+
+  # drop manifests of older mtimes
+  prefix = path.name.split("-")[0] + "-"
+  for old in path.parent.glob(f"{prefix}*.json"):
+    if old != path:
+      try:
+        old.unlink()
+      except OSError:
+        pass
+  return path
+
+def sync_manifest(script):
+  """Writes the manifest if missing for the script's current mtime, never raises"""
+  try:
+    path = manifest_file(script.script_full_path)
+    if path is None or path.exists():
+      return path
+    return write_manifest(script, path)
+  except Exception:
+    # only a cache, never break the script over it
+    return None
+
+def load_manifest(script_path):
+  """Manifest dict if one exists for the script's current mtime, else None"""
+  path = manifest_file(script_path)
+  if path is None:
+    return None
+  try:
+    with open(path, "r") as file:
+      data = json.load(file)
+  except (OSError, ValueError):
+    return None
+  return data if data.get("version") == MANIFEST_VERSION else None
+
+
+# ---- Stand-ins for ZScript built from a manifest (for RunnerUtils / help)
+
+class ManifestCommand:
+  def __init__(self, name, data):
+    self.name = name
+    self.short = data.get("short")
+    self.desc = data.get("desc")
+    self.args = data.get("args", [])
+
+  @cached_property
+  def argparser(self):
+    return manifest_parser(self.name, self.args)
+
+class ManifestCommands:
+  def __init__(self, commands: dict):
+    self._registers = {name: ManifestCommand(name, data) for name, data in commands.items()}
+
+  def items(self):
+    return self._registers.items()
+
+  def get(self, name, default=None):
+    return self._registers.get(name, default)
+
+class ManifestScript:
+  banner = None
+
+  def __init__(self, data: dict):
+    self.name = data["name"]
+    self.desc = data.get("desc")
+    self.author = data.get("author")
+    self.version = data.get("script_version")
+    self.script_name = data["script_name"]
+    self.commands = ManifestCommands(data["commands"])
+
+  @cached_property
+  def scr(self):
+    from zzz.modules.console import AdvConsole
+    return AdvConsole()
+
+def manifest_parser(name, args):
+  """Plain argparse parser from manifest arg specs, only for usage / help output"""
+  import argparse
+
+  parser = argparse.ArgumentParser(prog=name)
+  for spec in args:
+    kwargs = {key: spec[key] for key in (*_ARG_KEYS, "nargs", "choices", "default") if key in spec}
+    if spec.get("action") is not None:
+      kwargs["action"] = spec["action"]
+    try:
+      parser.add_argument(*spec["args"], **kwargs)
+    except (TypeError, ValueError, argparse.ArgumentError):
+      # custom actions etc, keep the flags at least
+      parser.add_argument(*spec["args"], help=spec.get("help"))
+  return parser
+
+
+# ---- Completion
+
+def _takes_value(spec) -> bool:
+  return spec.get("action") in _VALUE_ACTIONS and spec.get("nargs") != 0
+
+def complete_words(data: dict, words: list, cword: int) -> list:
+  """
+  Completion candidates for words[cword], words[0] is the script itself
+  (same layout as bash COMP_WORDS / COMP_CWORD)
+  """
+  current = words[cword] if cword < len(words) else ""
+
+  if cword <= 1:
+    return sorted(name for name in (*data["commands"], "-h", "--help") if name.startswith(current))
+
+  command = data["commands"].get(words[1])
+  if command is None:
+    return []
+
+  options, positionals = {}, []
+  for spec in command["args"]:
+    if spec["args"] and spec["args"][0].startswith("-"):
+      for flag in spec["args"]:
+        options[flag] = spec
+    else:
+      positionals.append(spec)
+
+  # value for the previous option
+  previous = options.get(words[cword - 1])
+  if previous is not None and _takes_value(previous):
+    return [c for c in previous.get("choices", []) if c.startswith(current)]
+
+  if current.startswith("-"):
+    return sorted(flag for flag in (*options, "-h", "--help") if flag.startswith(current))
+
+  # which positional is being typed
+  index, skip = 0, False
+  for word in words[2:cword]:
+    if skip:
+      skip = False
+    elif word.startswith("-"):
+      skip = word in options and _takes_value(options[word])
+    else:
+      index += 1
+
+  if index < len(positionals):
+    return [c for c in positionals[index].get("choices", []) if c.startswith(current)]
+  # *args and the like accept the last positional again
+  if positionals and positionals[-1].get("nargs") in ("*", "+"):
+    return [c for c in positionals[-1].get("choices", []) if c.startswith(current)]
+  return []
+
+
+def _ident(script_path: str) -> str:
+  return "".join(c if c.isalnum() else "_" for c in Path(script_path).stem)
+
+COMPLETION_SCRIPTS = {
+  "bash": """\
+_zzz_complete_{ident}() {{
+  local IFS=$'\\n'
+  COMPREPLY=( $({python} -m zzz complete {script} "$COMP_CWORD" "${{COMP_WORDS[@]}}" 2>/dev/null) )
+}}
+complete -o default -F _zzz_complete_{ident} {names}
+""",
+  "zsh": """\
+#compdef {names}
+_zzz_complete_{ident}() {{
+  local -a candidates
+  candidates=("${{(@f)$({python} -m zzz complete {script} $((CURRENT - 1)) "${{words[@]}}" 2>/dev/null)}}")
+  (( ${{#candidates}} )) && compadd -a candidates || _files
+}}
+compdef _zzz_complete_{ident} {names}
+""",
+}
+
+def completion_script(shell: str, script_path, python: str) -> str:
+  import shlex
+
+  if shell not in COMPLETION_SCRIPTS:
+    raise Exception(f"Unsupported shell: {shell}")
+
+  script_path = os.path.abspath(script_path)
+  names = [Path(script_path).name, script_path]
+  return COMPLETION_SCRIPTS[shell].format(
+    ident=_ident(script_path),
+    python=shlex.quote(python),
+    script=shlex.quote(script_path),
+    names=" ".join(shlex.quote(name) for name in names),
+  )
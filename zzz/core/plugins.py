@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+import importlib
+import importlib.util
+
+from pathlib import Path
+
+from zzz.utils.path import zzz_home
+
+
+# Plugins: command groups living in other modules (a package, a directory
+# of .py files like scripts/, or entry points). Their commands are found
+# by a static scan of the source (ast, no import), cached per file in
+# ~/.zzz/plugins keyed by mtime and size, and registered as LazyCommands.
+# A module is imported the first time one of its commands is looked up
+# (run, help of it, completion of its args).
+#
+# A plugin module is written like a script: a module level ZScript and
+# @<script>.on("name", short=...) decorated functions.
+PLUGINS_VERSION = 1
+
+
+def plugins_dir() -> Path:
+  return zzz_home() / "plugins"
+
+# ---- static scan
+
+def _constant(node):
+  import ast
+  return node.value if isinstance(node, ast.Constant) else None
+
+def scan_source(source: str, filename: str = "<plugin>") -> list:
+  """[{name, short, desc, executor}] of the @x.on("name") decorated functions of a module"""
+  # only imported when a file changed
+  import ast
+  return commands_of(ast.parse(source, filename))
+
+def commands_of(tree) -> list:
+  """scan_source for an already parsed module"""
+  import ast
+
+  commands = []
+  for node in tree.body:
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+      continue
+    for decorator in node.decorator_list:
+      if not (
+        isinstance(decorator, ast.Call)
+        and isinstance(decorator.func, ast.Attribute)
+        and decorator.func.attr == "on"
+        and decorator.args
+      ):
+        continue
+      name = _constant(decorator.args[0])
+      # zzz:<event> handlers are not commands
+      if not isinstance(name, str) or name.startswith("zzz:"):
+        continue
+      kwargs = {kw.arg: _constant(kw.value) for kw in decorator.keywords if kw.arg}
+      commands.append({
+        "name": name,
+        "short": kwargs.get("short"),
+        "desc": kwargs.get("desc") or ast.get_docstring(node),
+        "executor": kwargs.get("executor"),
+      })
+  return commands
+
+class ScanCache:
+  """Scan results of one plugin source, only changed files are parsed again"""
+  def __init__(self, key: str):
+    self.path = plugins_dir() / f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.json"
+    self.files = {}
+    self.changed = False
+    try:
+      with open(self.path, "r") as file:
+        data = json.load(file)
+      if data.get("version") == PLUGINS_VERSION:
+        self.files = data["files"]
+    except (OSError, ValueError, KeyError):
+      pass
+
+  def commands(self, path: str) -> list:
+    try:
+      stat = os.stat(path)
+    except OSError:
+      return []
+    entry = self.files.get(path)
+    if entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+      return entry["commands"]
+
+    try:
+      with open(path, "rb") as file:
+        commands = scan_source(file.read(), path)
+    except (OSError, SyntaxError, ValueError):
+      # broken file: no commands until it is fixed
+      commands = []
+    self.files[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "commands": commands}
+    self.changed = True
+    return commands
+
+  def save(self, paths) -> None:
+    # forget files that are gone
+    paths = set(paths)
+    if set(self.files) - paths:
+      self.files = {path: entry for path, entry in self.files.items() if path in paths}
+      self.changed = True
+    if not self.changed:
+      return
+    try:
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+      tmp.write_text(json.dumps({"version": PLUGINS_VERSION, "files": self.files}))
+      os.replace(tmp, self.path)
+    except OSError:
+      # only a cache
+      pass
+
+# ---- modules
+
+# source file - PluginModule of every discovered plugin, process-pool
+# workers forked before a plugin was imported load it by path
+_MODULES = {}
+
+def load_plugin(path: str):
+  plugin = _MODULES.get(path)
+  if plugin is None:
+    raise Exception(f"Unknown plugin {path}")
+  return plugin.load()
+
+class PluginModule:
+  """A plugin module, imported on first load()"""
+  def __init__(self, name: str, path: str, directory: str = None):
+    self.name = name            # module name
+    self.path = path            # source file
+    self.directory = directory  # put on sys.path (plain directories)
+    self.module = None
+    self._lock = threading.Lock()
+    _MODULES.setdefault(path, self)
+
+  def load(self):
+    with self._lock:
+      if self.module is None:
+        try:
+          self.module = self._import()
+        except Exception as e:
+          raise Exception(f"Failed to load plugin {self.path}: {e}")
+      return self.module
+
+  def _import(self):
+    from zzz.core.runner import loading_plugin
+
+    # the module's run_script(...) must not start a runner with the host's argv
+    with loading_plugin(self.path):
+      return self._exec()
+
+  def _exec(self):
+    if self.directory is None:
+      return importlib.import_module(self.name)
+
+    # siblings import each other like scripts run from their directory do
+    if self.directory not in sys.path:
+      sys.path.append(self.directory)
+    spec = importlib.util.spec_from_file_location(self.name, self.path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[self.name] = module
+    try:
+      spec.loader.exec_module(module)
+    except BaseException:
+      del sys.modules[self.name]
+      raise
+    return module
+
+  def scripts(self):
+    """ZScripts defined by the module"""
+    from zzz.core.context.script import ZScript
+
+    module = self.load()
+    return [value for value in vars(module).values() if isinstance(value, ZScript)]
+
+class LazyCommand:
+  """
+  Stand-in for a plugin's ScriptCommand: what listings and completion of
+  names need, the module is loaded by ScriptCommands.get.
+  """
+  lazy = True
+
+  def __init__(self, name: str, plugin: PluginModule, spec: dict, prefix: str = ""):
+    self.name = prefix + name
+    self.plugin_name = name  # name in the plugin's own script
+    self.plugin = plugin
+    self.prefix = prefix
+    self.short = spec.get("short")
+    self.desc = spec.get("desc")
+    self.executor = spec.get("executor")
+
+  def resolve(self, registers: dict):
+    """Loads the module and replaces every LazyCommand of it in registers, returns the real command"""
+    found = None
+    for script in self.plugin.scripts():
+      for name, command in script.commands.items():
+        target = self.prefix + name
+        current = registers.get(target)
+        if current is not None and not (current.lazy and current.plugin is self.plugin):
+          continue  # taken by the host script or another plugin
+        command.name = target
+        registers[target] = command
+        if name == self.plugin_name:
+          found = command
+    if found is None:
+      raise Exception(f"Plugin {self.plugin.path} does not define command '{self.plugin_name}'")
+    return found
+
+# ---- discovery
+
+def _module_files(directory: Path):
+  return sorted(
+    path for path in directory.glob("*.py")
+    if not path.name.startswith("_")
+  )
+
+def _directory_modules(path: Path):
+  directory = str(path)
+  digest = hashlib.sha1(directory.encode()).hexdigest()[:8]
+  for file in _module_files(path):
+    yield PluginModule(f"zzz_plugin_{digest}_{file.stem}", str(file), directory)
+
+def _package_modules(package: str):
+  # imports the parent packages only, not package itself
+  spec = importlib.util.find_spec(package)
+  if spec is None or not spec.submodule_search_locations:
+    raise Exception(f"Plugin package '{package}' not found")
+  for location in spec.submodule_search_locations:
+    for file in _module_files(Path(location)):
+      yield PluginModule(f"{package}.{file.stem}", str(file))
+
+def _entry_point_modules(group: str):
+  from importlib.metadata import entry_points
+
+  eps = entry_points()
+  eps = eps.select(group=group) if hasattr(eps, "select") else eps.get(group, [])  # python < 3.10
+  seen = set()
+  for ep in eps:
+    module = ep.value.split(":")[0].strip()
+    if module in seen:
+      continue
+    seen.add(module)
+    spec = importlib.util.find_spec(module)
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+      continue
+    yield PluginModule(module, spec.origin)
+
+def discover(package: str = None, path=None, entry_points: str = None, prefix: str = "") -> list:
+  """LazyCommands of every command found in the plugin source (one of package / path / entry_points)"""
+  if sum(source is not None for source in (package, path, entry_points)) != 1:
+    raise ValueError("add_plugins needs exactly one of package, path or entry_points")
+
+  if package is not None:
+    key, modules = f"package:{package}", _package_modules(package)
+  elif path is not None:
+    path = Path(path).resolve()
+    if not path.is_dir():
+      raise Exception(f"Plugin directory '{path}' not found")
+    key, modules = f"path:{path}", _directory_modules(path)
+  else:
+    key, modules = f"entry_points:{entry_points}", _entry_point_modules(entry_points)
+
+  cache = ScanCache(key)
+  commands, paths = [], []
+  for module in modules:
+    paths.append(module.path)
+    for spec in cache.commands(module.path):
+      commands.append(LazyCommand(spec["name"], module, spec, prefix))
+  cache.save(paths)
+  return commands
@@ -0,0 +1,164 @@
+import os
+import re
+import time
+
+from zzz.utils.path import ensure_dir, zzz_home
+
+
+# cpu: cProfile, mem: tracemalloc, all: both
+PROFILE_MODES = ("cpu", "mem", "all")
+
+def profiles_dir():
+  return ensure_dir(zzz_home() / "profiles")
+
+def parse_profile_flag(arg: str):
+  """'--zzz-profile' / '--zzz-profile=mem' -> mode, None if arg is not the flag"""
+  flag, _, mode = arg.partition("=")
+  if flag != "--zzz-profile":
+    return None
+  mode = mode or "cpu"
+  if mode not in PROFILE_MODES:
+    raise ValueError(f"unknown profile mode '{mode}', use one of: {', '.join(PROFILE_MODES)}")
+  return mode
+
+def _short_path(path: str) -> str:
+  # script files relative to cwd, libraries as <package>/<file>
+  cwd = os.getcwd()
+  if path.startswith(cwd + os.sep):
+    return os.path.relpath(path, cwd)
+  return os.path.join(*path.split(os.sep)[-2:]) if os.sep in path else path
+
+class CommandProfiler:
+  """
+  Profiles a single command call, not the script start-up around it.
+
+    profiler = CommandProfiler("all")
+    result = profiler.run(command, args)
+    profiler.report(scr)
+
+  Commands with executor="process" are profiled in this process, the
+  pool would only show the time spent waiting on the worker. In "all"
+  mode tracemalloc slows the call down, cpu timings are relative only.
+  """
+  def __init__(self, mode: str = "cpu", top: int = 20, save: bool = True):
+    if mode not in PROFILE_MODES:
+      raise ValueError(f"unknown profile mode '{mode}', use one of: {', '.join(PROFILE_MODES)}")
+    self.mode = mode
+    self.top = top
+    self.save = save
+
+    self.name = None
+    self.elapsed = 0.0
+    self.stats = None     # pstats.Stats
+    self.snapshot = None  # tracemalloc.Snapshot
+    self.peak = 0
+    self.files = []
+
+  @property
+  def cpu(self) -> bool:
+    return self.mode in ("cpu", "all")
+
+  @property
+  def mem(self) -> bool:
+    return self.mode in ("mem", "all")
+
+  def run(self, command, args):
+    """Calls the command with parsed args (namespace or dict) under the profilers"""
+    arg_dict = args if isinstance(args, dict) else vars(args)
+    arg_dict = {k: v for k, v in arg_dict.items() if not k.startswith("cmd2_")}
+    self.name = command.name
+
+    # import everything up front, it would show up in the memory report
+    import pstats
+    import cProfile
+    import tracemalloc
+
+    profiler = cProfile.Profile() if self.cpu else None
+    if self.mem:
+      tracemalloc.start(25)
+
+    start = time.perf_counter()
+    try:
+      if profiler is not None:
+        profiler.enable()
+      try:
+        return command.plan.call(command.func, arg_dict)
+      finally:
+        if profiler is not None:
+          profiler.disable()
+    finally:
+      self.elapsed = time.perf_counter() - start
+      if self.mem:
+        self.snapshot = tracemalloc.take_snapshot().filter_traces((
+          tracemalloc.Filter(False, tracemalloc.__file__),
+          tracemalloc.Filter(False, __file__),
+        ))
+        self.peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+      if profiler is not None:
+        self.stats = pstats.Stats(profiler)
+      if self.save:
+        self.files = self.dump()
+
+  # ---- results
+
+  def cpu_rows(self):
+    """(calls, tottime, cumtime, percall, function) sorted by cumulative time"""
+    if self.stats is None:
+      return []
+    entries = sorted(self.stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    rows = []
+    for (path, line, func), (_, calls, tottime, cumtime, _) in entries:
+      if func == "<method 'disable' of '_lsprof.Profiler' objects>":
+        continue
+      where = f"{_short_path(path)}:{line}({func})" if path != "~" else func
+      rows.append((calls, f"{tottime:.4f}", f"{cumtime:.4f}", f"{cumtime / calls:.6f}" if calls else "-", where))
+      if len(rows) >= self.top:
+        break
+    return rows
+
+  def mem_rows(self):
+    """(size, count, line) of the allocations still alive after the call, largest first"""
+    if self.snapshot is None:
+      return []
+    rows = []
+    for stat in self.snapshot.statistics("lineno")[:self.top]:
+      frame = stat.traceback[0]
+      rows.append((_format_size(stat.size), stat.count, f"{_short_path(frame.filename)}:{frame.lineno}"))
+    return rows
+
+  def report(self, scr) -> None:
+    if self.cpu:
+      scr.print_table(
+        ["Calls", "Total (s)", "Cumulative (s)", "Per call (s)", "Function"],
+        self.cpu_rows(),
+        title=f"CPU: {self.name} ({self.elapsed:.3f}s)"
+      )
+    if self.mem:
+      scr.print_table(
+        ["Size", "Blocks", "Line"],
+        self.mem_rows(),
+        title=f"Memory: {self.name} (peak {_format_size(self.peak)})"
+      )
+    for path in self.files:
+      scr.print(f"[dim]profile saved: {path}[/dim]", highlight=False)
+
+  def dump(self):
+    """Writes <command>-<time>.prof (pstats / snakeviz) and .snapshot (tracemalloc) files"""
+    name = re.sub(r"[^\w.-]", "_", self.name or "command")
+    base = profiles_dir() / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}"
+    files = []
+    if self.stats is not None:
+      self.stats.dump_stats(f"{base}.prof")
+      files.append(f"{base}.prof")
+    if self.snapshot is not None:
+      self.snapshot.dump(f"{base}.snapshot")
+      files.append(f"{base}.snapshot")
+    return files
+
+def _format_size(size: int) -> str:
+  for unit in ("B", "KiB", "MiB"):
+    if abs(size) < 1024:
+      return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+    size /= 1024
+  return f"{size:.1f} GiB"
@@ -1,13 +1,52 @@
+import os
 import sys
+import threading
+
+from contextlib import contextmanager
+
+# set in spawned process-pool workers (see zzz.core.context.worker)
+WORKER_ENV = "ZZZ_WORKER"
+
+# source file of the plugin module being imported (see zzz.core.plugins):
+# its run_script* calls do nothing and its ZScript belongs to that file
+LOADING_PLUGIN = None
+_plugin_lock = threading.RLock()
+
+@contextmanager
+def loading_plugin(path: str):
+  global LOADING_PLUGIN
+  # one plugin import at a time, a plugin loading another one nests
+  with _plugin_lock:
+    previous, LOADING_PLUGIN = LOADING_PLUGIN, path
+    try:
+      yield
+    finally:
+      LOADING_PLUGIN = previous
+
+def _embedded() -> bool:
+  """Imported by a worker or as a plugin: the module must not start a runner"""
+  return LOADING_PLUGIN is not None or bool(os.environ.get(WORKER_ENV))
 
 # ------ Run types
 def run_script_it(script, intro: bool = True):
+  if _embedded():
+    return None
   from .interactive import ZScriptRunner
   return ZScriptRunner(script).run(intro=intro)
 
 def run_script_cli(script, intro: bool = False):
+  if _embedded():
+    return None
   from .cli import ZScriptRunnerCli
   return ZScriptRunnerCli(script).run(intro=intro)
 
+def run_script_daemon(script, idle_timeout: float = None):
+  if _embedded():
+    return None
+  from .daemon import ZScriptDaemon
+  return ZScriptDaemon(script, idle_timeout).serve()
+
 def run_script(script, *args, **kwargs):
+  if _embedded():
+    return None
   return run_script_cli(script, *args, **kwargs) if len(sys.argv) > 1 else run_script_it(script, *args, **kwargs)
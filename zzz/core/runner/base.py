@@ -1,4 +1,3 @@
-from rich.table import Table
 from zzz.core import __version__
 
 BANNER = r"""
@@ -18,6 +17,12 @@ class RunnerUtils:
   def scr(self): # global scr for runners
     return self.script.scr
   
+  def close_progress(self):
+    # after a command: the live view must not keep redrawing bars it left open
+    view = self.script.__dict__.get("progress_view")
+    if view is not None:
+      view.close_all()
+
   def print_zzz_header(self):
     self.scr.print_center(self.script.banner or BANNER)
     self.scr.print_center(f"zzz: [blue]luvbyte[/blue] | version: [red]{__version__}[/red]")
@@ -40,6 +45,8 @@ class RunnerUtils:
     self.print_script_header()
 
   def _print_commands(self, cmd2_commands: bool):
+    from rich.table import Table
+
     commands = list(self.script.commands.items())
 
     self.scr.print_center(f"[italic magenta]{'No' if not cmd2_commands and len(commands) <= 0 else ''} Available Commands[/italic magenta]")
@@ -70,6 +77,12 @@ class RunnerUtils:
           "shortcuts": "List available keyboard shortcuts",
           "options": "Display ZOptions",
           "zset": "Set ZOption",
+          "bg": "Run a command in background (or: command &)",
+          "jobs": "List background jobs (-w: live progress)",
+          "wait": "Wait for a job and show its output",
+          "fg": "Attach to a job's output",
+          "cancel": "Cancel a job",
+          "profile": "Profile a command (cpu / mem)",
         }
         for name, desc in builtin_commands.items():
           table.add_row(name, desc)
@@ -91,6 +104,8 @@ class RunnerUtils:
     return self._print_commands(False)
 
   def print_options(self, required_only: bool = False):
+    from rich.table import Table
+
     options = self.script.options._options
 
     # Filter only required options if present
@@ -136,6 +151,36 @@ class RunnerUtils:
 
     self.scr.print(table)
 
+  def print_cache_stats(self):
+    stats = self.script.caches.stats() if "caches" in self.script.__dict__ else []
+    if not stats:
+      return self.scr.print_center("\n[italic red]Script has no cached functions[/italic red]\n")
+
+    rows = [
+      (
+        stat["name"],
+        stat["entries"],
+        f"{stat['bytes'] / 1024:.1f} KiB",
+        stat["disk_entries"],
+        f"{stat['disk_bytes'] / 1024:.1f} KiB",
+        stat["hits"],
+        stat["disk_hits"],
+        stat["misses"],
+        f"{stat['hit_rate'] * 100:.0f}%" if stat["hit_rate"] is not None else "-",
+        stat["evictions"],
+      )
+      for stat in stats
+    ]
+    self.scr.print_table(
+      ["Function", "Entries", "Memory", "On disk", "Disk", "Hits", "Disk hits", "Misses", "Hit %", "Evicted"],
+      rows,
+      title="Script Cache"
+    )
+
   def exception(self, text):
+    if self.scr.output_mode:
+      # stdout carries records only
+      import sys
+      return print(f"Error: zzz: {text}", file=sys.stderr)
     self.scr.print(f"[red]Error:[/red] zzz: [blue]{text}[/blue]")
 
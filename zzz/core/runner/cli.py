@@ -1,13 +1,21 @@
+import sys
+import time
+import shlex
+
 from .base import RunnerUtils
 
 from zzz.core.context import ZScript
+from zzz.core.manifest import sync_manifest, write_manifest
 
 
 # cli
 class ZScriptRunnerCli:
-  def __init__(self, script: ZScript):
+  def __init__(self, script: ZScript, process_pool: bool = False):
     self.script = script
     self.utils = RunnerUtils(self.script)
+    # run executor="process" commands in the pool even for a single command
+    # (daemon children), a plain cli call runs them in this process
+    self.process_pool = process_pool
 
   @property
   def scr(self):
@@ -16,12 +24,36 @@ class ZScriptRunnerCli:
   def _display_cli_help(self):
     self.utils.print_script_header()
     self.scr.print(f"[red]Usage[/red]: {self.script.script_name} command [ARGS] [-h]")
+    self.scr.print(f"       {self.script.script_name} --batch [FILE] [-k] [-q] [-h]")
+    self.scr.print(f"       {self.script.script_name} --zzz-profile[=cpu|mem|all] command [ARGS]")
+    self.scr.print(f"       {self.script.script_name} --output=json|jsonl|plain command [ARGS]")
     self.scr.br()
 
     self.utils.print_commands_cli()
     
+  def _take_output_flag(self, args):
+    # --output=MODE / --output MODE in front of the command
+    if not args or not args[0].startswith("--output"):
+      return args
+    flag, _, mode = args[0].partition("=")
+    if flag != "--output":
+      return args
+    if not mode:
+      mode, args = (args[1] if len(args) > 1 else ""), args[1:]
+    try:
+      self.script.set_output(mode)
+    except ValueError as e:
+      self.exception(str(e))
+      sys.exit(2)
+    return args[1:]
+
+  def emit_result(self, result) -> None:
+    # output modes serialize what commands return, rich mode leaves it alone
+    if result is not None and self.scr.output_mode:
+      self.scr.emit(result)
+
   def run(self, intro: bool = False):
-    args = self.script.args._raw_args
+    args = self._take_output_flag(self.script.args._raw_args)
 
     if len(args) <= 0:
       args = ["-h"]
@@ -29,10 +61,28 @@ class ZScriptRunnerCli:
     command = args[0]
     command_args = args[1:]
 
+    # (re)write manifest for help / completion, used by `python -m zzz complete`
+    # (which asks for it when missing), a plain dispatch never builds one:
+    # it would parse every command's signature after each script edit
+    if command == "--zzz-manifest":
+      return print(write_manifest(self.script))
+
+    # resident server for `python -m zzz.client`
+    if command == "--zzz-daemon":
+      from .daemon import ZScriptDaemon
+      return ZScriptDaemon(self.script).serve()
+
     # Show help
     if command in ("-h", "--help"):
+      sync_manifest(self.script)
       return self._display_cli_help()
 
+    if command == "--batch":
+      return self.run_batch(command_args)
+
+    if command.startswith("--zzz-profile"):
+      return self.run_profile(command, command_args)
+
     if intro:
       self.utils.print_intro()
     
@@ -41,7 +91,131 @@ class ZScriptRunnerCli:
       self.exception(f"command '{command}' not found")
       return self.scr.br()
 
-    func.run_cli(command_args)
+    if func.executor == "process" and not self.process_pool:
+      from zzz.core.context.worker import set_inline
+      set_inline()
+
+    try:
+      self.emit_result(func.run_cli(command_args))
+    finally:
+      self.utils.close_progress()
   
+  # ---- profile: one command under cProfile / tracemalloc
+
+  def run_profile(self, flag: str, argv):
+    from zzz.core.profiler import CommandProfiler, parse_profile_flag
+
+    try:
+      mode = parse_profile_flag(flag)
+    except ValueError as e:
+      self.exception(str(e))
+      return sys.exit(2)
+    if mode is None:
+      self.exception(f"command '{flag}' not found")
+      return self.scr.br()
+    if not argv:
+      self.exception("--zzz-profile needs a command to run")
+      return sys.exit(2)
+
+    command = self.script.commands.get(argv[0])
+    if command is None:
+      self.exception(f"command '{argv[0]}' not found")
+      return self.scr.br()
+
+    # parse outside of the profiled call
+    args = command.argparser.parse_args(argv[1:])
+    profiler = CommandProfiler(mode)
+    try:
+      profiler.run(command, args)
+    finally:
+      profiler.report(self.scr)
+
+  # ---- batch: many command lines in one process
+
+  def _batch_parser(self):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+      prog=f"{self.script.script_name} --batch",
+      description="Run one command line per input line (empty lines and # comments are skipped)"
+    )
+    parser.add_argument("file", nargs="?", default="-", help="file with command lines, - for stdin (default)")
+    parser.add_argument("-k", "--keep-going", action="store_true", help="continue after a failing line")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only report failing lines and the summary")
+    return parser
+
+  def run_line(self, line: str):
+    """Runs one command line, returns None or the error text"""
+    try:
+      argv = shlex.split(line)
+    except ValueError as e:
+      return f"parse error: {e}"
+
+    command = self.script.commands.get(argv[0])
+    if command is None:
+      return f"command '{argv[0]}' not found"
+    try:
+      self.emit_result(command.run_cli(argv[1:]))
+    except SystemExit as e:
+      # argparse error (usage already on stderr) or -h
+      return None if not e.code else "invalid arguments"
+    except Exception as e:
+      return str(e) or type(e).__name__
+    finally:
+      self.utils.close_progress()
+    return None
+
+  def run_batch(self, argv):
+    from zzz.utils.cli import iter_stdin
+
+    opts = self._batch_parser().parse_args(argv)
+    if opts.file == "-":
+      lines = iter_stdin()
+      if lines is None:
+        self.exception("--batch reads stdin, pipe command lines in or give a FILE")
+        return sys.exit(2)
+      return self._run_batch_lines(opts, lines)
+
+    try:
+      file = open(opts.file, "r")
+    except OSError as e:
+      self.exception(f"--batch: cannot read '{opts.file}': {e.strerror or e}")
+      return sys.exit(2)
+    with file:
+      return self._run_batch_lines(opts, file)
+
+  def _run_batch_lines(self, opts, lines):
+    # status goes to stderr, stdout stays the commands' output
+    status = sys.stderr
+    total = failed = 0
+    start = time.perf_counter()
+    for lineno, line in enumerate(lines, start=1):
+      line = line.strip()
+      if not line or line.startswith("#"):
+        continue
+
+      total += 1
+      line_start = time.perf_counter()
+      error = self.run_line(line)
+      elapsed = (time.perf_counter() - line_start) * 1000
+
+      if error is None:
+        if not opts.quiet:
+          status.write(f"[{lineno}] ok {elapsed:.1f}ms: {line}\n")
+        continue
+
+      failed += 1
+      status.write(f"[{lineno}] error {elapsed:.1f}ms: {line}: {error}\n")
+      if not opts.keep_going:
+        break
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    status.write(f"batch: {total} lines, {total - failed} ok, {failed} failed in {elapsed:.2f}s ({rate:.0f} lines/s)\n")
+    status.flush()
+
+    if failed:
+      sys.exit(1)
+
   def exception(self, text):
     self.utils.exception(text)
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import fcntl
+import select
+import signal
+import socket
+import traceback
+
+from zzz.client import socket_path, recv_fds
+from zzz.core.context import ZScript
+
+from .cli import ZScriptRunnerCli
+
+
+def _exit_code(status: int) -> int:
+  # os.waitstatus_to_exitcode is python 3.9+
+  if os.WIFSIGNALED(status):
+    # killed by a signal: 128 + signum like a shell reports it
+    return 128 + os.WTERMSIG(status)
+  if os.WIFEXITED(status):
+    return os.WEXITSTATUS(status)
+  return 1
+
+# Resident server for a ZScript: the script is imported (and warmed up)
+# once, every client call is served by a forked child that takes over the
+# client's stdin / stdout / stderr, cwd and env. See zzz.client.
+class ZScriptDaemon:
+  def __init__(self, script: ZScript, idle_timeout: float = None):
+    self.script = script
+    self.script_path = os.path.abspath(script.script_full_path)
+    self.idle_timeout = script.daemon_idle if idle_timeout is None else idle_timeout
+
+    self.path = socket_path(self.script_path)
+    self._mtime = os.stat(self.script_path).st_mtime_ns
+    # child pid - client connection, the exit code goes back on reap
+    self._children = {}
+    self._server = None
+    self._lock_fd = None
+
+  def _acquire(self) -> bool:
+    # one daemon per script, the lock lives as long as the daemon listens
+    # only we may reach the sockets: the directory is ours alone
+    directory = os.path.dirname(self.path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    os.chmod(directory, 0o700)
+    self._lock_fd = os.open(self.path[:-len(".sock")] + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+      fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+      return True
+    except OSError:
+      os.close(self._lock_fd)
+      self._lock_fd = None
+      return False
+
+  def _listen(self):
+    if os.path.exists(self.path):
+      os.unlink(self.path)  # left over, we hold the lock
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # created 0600, a chmod after bind leaves a window for other users
+    umask = os.umask(0o177)
+    try:
+      server.bind(self.path)
+    finally:
+      os.umask(umask)
+    server.listen(64)
+    return server
+
+  def _stop_listening(self):
+    # a new daemon can start while we wait for running children
+    if self._server is not None:
+      self._server.close()
+      self._server = None
+      try:
+        os.unlink(self.path)
+      except OSError:
+        pass
+    if self._lock_fd is not None:
+      os.close(self._lock_fd)
+      self._lock_fd = None
+
+  def _stale(self) -> bool:
+    try:
+      return os.stat(self.script_path).st_mtime_ns != self._mtime
+    except OSError:
+      return True
+
+  def serve(self):
+    if not self._acquire():
+      return print(f"zzz: daemon already running for {self.script_path}", file=sys.stderr)
+
+    self._server = self._listen()
+    # pay for the console import once here, not in every child
+    import zzz.modules.console
+    # SIGCHLD wakes select up through the wakeup pipe
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda *args: None)
+    signal.signal(signal.SIGTERM, lambda *args: self._stop_listening())
+
+    print(f"zzz: daemon {os.getpid()} serving {self.script_path} on {self.path}", file=sys.stderr, flush=True)
+    last_active = time.monotonic()
+    try:
+      while self._server is not None or self._children:
+        fds = [wakeup_r] + ([self._server] if self._server is not None else [])
+        try:
+          ready, _, _ = select.select(fds, [], [], 1.0)
+        except InterruptedError:
+          ready = []
+
+        if wakeup_r in ready:
+          try:
+            os.read(wakeup_r, 4096)
+          except BlockingIOError:
+            pass
+        self._reap()
+
+        if self._server is not None and self._server in ready:
+          conn, _ = self._server.accept()
+          last_active = time.monotonic()
+          if self._stale():
+            # script changed, clients reconnect to a fresh daemon
+            conn.sendall(b"stale\n")
+            conn.close()
+            self._stop_listening()
+          else:
+            self._handle(conn)
+
+        if self._children:
+          last_active = time.monotonic()
+        elif self._server is not None and self.idle_timeout and time.monotonic() - last_active > self.idle_timeout:
+          self._stop_listening()
+    finally:
+      self._stop_listening()
+      signal.set_wakeup_fd(-1)
+
+  def _reap(self):
+    while self._children:
+      try:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+      except ChildProcessError:
+        return
+      if pid == 0:
+        return
+      conn = self._children.pop(pid, None)
+      if conn is None:
+        continue
+      try:
+        conn.sendall(f"exit {_exit_code(status)}\n".encode())
+      except OSError:
+        pass
+      conn.close()
+
+  def _read_request(self, conn):
+    data, fds = recv_fds(conn, 1 << 16, 3)
+    while not data.endswith(b"\n"):
+      chunk = conn.recv(1 << 16)
+      if not chunk:
+        break
+      data += chunk
+    return json.loads(data), fds
+
+  def _handle(self, conn):
+    try:
+      request, fds = self._read_request(conn)
+    except (OSError, ValueError):
+      return conn.close()
+    if len(fds) != 3:
+      for fd in fds:
+        os.close(fd)
+      return conn.close()
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+      self._child(conn, request, fds)
+
+    for fd in fds:
+      os.close(fd)
+    self._children[pid] = conn
+    try:
+      conn.sendall(f"pid {pid}\n".encode())
+    except OSError:
+      pass
+
+  def _child(self, conn, request, fds):
+    code = 1
+    try:
+      conn.close()
+      if self._server is not None:
+        self._server.close()
+      signal.set_wakeup_fd(-1)
+      signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+      signal.signal(signal.SIGTERM, signal.SIG_DFL)
+      signal.signal(signal.SIGINT, signal.default_int_handler)
+
+      # become the client: its stdio, cwd and env
+      for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+      sys.stdout.reconfigure(line_buffering=os.isatty(1))
+      os.chdir(request["cwd"])
+      os.environ.clear()
+      os.environ.update(request["env"])
+
+      sys.argv = [self.script_path] + request["argv"]
+      self.script.args._raw_args = request["argv"]
+      # console detects terminal / colors on creation, make a fresh one
+      self.script.__dict__.pop("scr", None)
+
+      code = 0
+      ZScriptRunnerCli(self.script, process_pool=True).run()
+    except SystemExit as e:
+      code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except KeyboardInterrupt:
+      code = 130
+    except BaseException:
+      traceback.print_exc()
+      code = 1
+    finally:
+      try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+      finally:
+        os._exit(code)
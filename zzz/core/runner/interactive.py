@@ -9,6 +9,8 @@ from rich.text import Text
 from rich.table import Table
 
 from zzz.core.context import ZScript, ScriptCommand
+from zzz.core.manifest import sync_manifest
+from zzz.core.completion import PrefixIndex, VersionedIndex
 
 from zzz.modules.process import sh
 
@@ -21,9 +23,10 @@ def make_script_parser():
   script_argparse = Cmd2ArgumentParser()
   script_argparse.add_argument(
     'subcommand',
-    choices=['commands', 'commands-full', 'options', 'options-required'],
+    choices=['commands', 'commands-full', 'options', 'options-required', 'cache', 'cache-clear'],
     help='Choose subcommand'
   )
+  script_argparse.add_argument('name', nargs='?', help='cached function for cache-clear (default: all)')
   return script_argparse
 
 # cmd2 - interactive
@@ -40,50 +43,99 @@ class ZScriptRunner(Cmd):
     self.script = script
 
     self.utils = RunnerUtils(self.script)
-    self._register_commands()
+    # set by `profile on [MODE]`, every command is profiled until `profile off`
+    self.profile_mode = None
+
+    # completion indexes, rebuilt only when commands / options are added
+    self._command_index = VersionedIndex(self._all_command_names, self._commands_version)
+    self._option_index = VersionedIndex(lambda: self.script.options._options, lambda: self.script.options.version)
+    self._choice_indexes = {}  # option name - PrefixIndex of its choices
+
+    # fork process-pool workers now, before cmd2 / tasks start threads
+    worker = sys.modules.get("zzz.core.context.worker")
+    if worker is not None and worker.has_process_commands():
+      worker.process_pool()
     
     # emit init event
     self.script.events.emit("init")
 
-  # arg parser
-  def __register_commands(self):
-    for name, command in self.script.commands.items():
-      # Build methods directly
-      @with_argparser(command.argparser)
-      def do_func(self, args, cmd=command):
-        try:
-          cmd.run(args)
-        except Exception as e:
-          self.exception(e.args[0])
-      
-      do_func.argparser.prog = name
-  
-      setattr(self, f"do_{name}", types.MethodType(do_func, self))
-  
-  def _register_commands(self):
-    for name, command in self.script.commands.items():
-      desired_prog = command.argparser.prog or name
-
-      @with_argparser(command.argparser)
-      def do_func(inner_self, args, cmd=command):
-        try:
-          cmd.run(args)
-        except Exception as e:
-          inner_self.exception(e.args[0])
-
-      # cmd2's decorator changes both the argparser.prog and the function name
-      # Fix them back:
-      do_func.argparser.prog = desired_prog    # fixes Usage: text
-      do_func.__name__ = f"do_{name}"  # fixes command name in help
-      do_func.__qualname__ = f"do_{name}"  # also for introspection
-
-      # finally bind the method to your instance
-      setattr(self, f"do_{name}", types.MethodType(do_func, self))
-  
+  # ---- script commands, resolved on first use
+  #
+  # cmd2 finds commands with getattr(self, "do_<name>") and lists them with
+  # dir(self). do_<name> of a script command is built (argparser, cmd2
+  # wrapper) the first time it is looked up and then kept on the instance,
+  # so startup does not depend on how many commands the script has.
+
+  def __getattr__(self, name):
+    # only called when normal lookup failed; script is unset during cmd2's __init__
+    script = self.__dict__.get("script")
+    if script is not None and name.startswith("do_"):
+      command = script.commands.get(name[3:])
+      if command is not None:
+        method = self._command_method(command)
+        setattr(self, name, method)
+        return method
+    raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+  def __dir__(self):
+    names = super().__dir__()
+    script = self.__dict__.get("script")
+    if script is not None:
+      names.extend(f"do_{name}" for name, _ in script.commands.items())
+    return names
+
+  def _command_method(self, command: ScriptCommand):
+    name = command.name
+    desired_prog = command.argparser.prog or name
+
+    @with_argparser(command.argparser)
+    def do_func(inner_self, args, cmd=command):
+      if inner_self.profile_mode:
+        return inner_self._profile(cmd, args, inner_self.profile_mode)
+      if cmd.executor == "process":
+        # runs in the process pool, keep the prompt free
+        inner_self._submit_task(args.cmd2_statement.get().raw, cmd.run, args)
+        return
+      try:
+        result = cmd.run(args)
+      except Exception as e:
+        return inner_self.exception(e.args[0])
+      finally:
+        inner_self.utils.close_progress()
+      if result is not None and inner_self.scr.output_mode:
+        inner_self.scr.emit(result)
+
+    # cmd2's decorator changes both the argparser.prog and the function name
+    # Fix them back:
+    do_func.argparser.prog = desired_prog    # fixes Usage: text
+    do_func.__name__ = f"do_{name}"  # fixes command name in help
+    do_func.__qualname__ = f"do_{name}"  # also for introspection
+
+    return types.MethodType(do_func, self)
+
+  def _all_command_names(self):
+    # like cmd2's get_all_commands, without a getattr (= building) per script command
+    names = {name for name, _ in self.script.commands.items()}
+    for attr in super().__dir__():
+      if attr.startswith("do_") and attr[3:] not in names and callable(getattr(self, attr, None)):
+        names.add(attr[3:])
+    return names
+
   @property
   def scr(self):
     return self.utils.scr
 
+  def _commands_version(self):
+    # command sets can be (un)registered on the cmd2 side too
+    return (self.script.commands.version, len(self._installed_command_sets))
+
+  def get_all_commands(self):
+    # cmd2 walks dir(self) for this on every TAB of a command name
+    index = self.__dict__.get("_command_index")
+    if index is None:  # cmd2's own __init__
+      return super().get_all_commands()
+    return list(index.index.words)
+
   @property
   def prompt(self):
     prompt = self.script.events.emit("prompt") or self.script.prompt
@@ -97,11 +149,207 @@ class ZScriptRunner(Cmd):
     sh(f"ls --color {line}").run()
 
   def do_pwd(self, line):
+    if not line:
+      # no need to fork a shell for that
+      return self.scr.print(self.script.cwd, markup=False, highlight=False)
     sh(f"pwd {line}").run()
 
   def do_exit(self, line):
     return True
 
+  # --- background jobs (ScriptTasks)
+  def precmd(self, statement):
+    # `command [ARGS] &` -> `bg command [ARGS]`, for script commands only:
+    # builtins keep their `&` (`shell cmd &` is the shell's own background)
+    raw = statement.raw.rstrip()
+    if raw.endswith("&") and not raw.endswith("&&") and self.script.commands.has(statement.command):
+      return self.statement_parser.parse(f"bg {raw[:-1]}")
+    return statement
+
+  def postcmd(self, stop, statement):
+    for task in self.script.tasks.finished_unnotified():
+      self.scr.print(f"[blue][{task.id}][/blue] {task.status}: {task.name} [dim](wait {task.id} for output)[/dim]")
+    # queued output (scr.start_sink) goes out before the prompt
+    self.scr.sync()
+    return stop
+
+  def postloop(self):
+    tasks = self.script.tasks
+    running = [task for _, task in tasks.items() if not task.done]
+    if running:
+      self.scr.print(f"[yellow]zzz[/yellow]: waiting for {len(running)} running job(s) to stop")
+    tasks.shutdown(wait=False)
+
+  def _get_task(self, line):
+    if not line:
+      self.scr.print("[red]Usage[/red]: <job id>\n")
+      return None
+    task = self.script.tasks.get(line.arg_list[0])
+    if task is None:
+      self.exception(f"job '{line.arg_list[0]}' not found")
+    return task
+
+  def _finish_task(self, task):
+    # print what is left of the job and forget it
+    task.notified = True
+    self.scr.sync()
+    self.scr.file.write(task.output.getvalue())
+    if task.status == "failed":
+      error = task.future.exception()
+      self.exception(error.args[0] if error.args else repr(error))
+    elif task.status == "done" and task.future.result() is not None:
+      self.scr.print(task.future.result())
+    self.scr.print(f"[blue][{task.id}][/blue] {task.status}: {task.name} ({task.elapsed:.1f}s)")
+    self.script.tasks.remove(task)
+
+  def complete_job(self, text, line, begidx, endidx):
+    return [str(id) for id, _ in self.script.tasks.items() if str(id).startswith(text)]
+
+  complete_wait = complete_fg = complete_cancel = complete_job
+
+  def help_bg(self):
+    self.scr.print("[red]Usage[/red]: bg <command> [ARGS]  or  <command> [ARGS] &\n\nRun a command in background\n")
+
+  def do_bg(self, line):
+    if not line:
+      return self.help_bg()
+
+    statement = self.statement_parser.parse(line.args)
+    command = self.script.commands.get(statement.command)
+    if command is None:
+      return self.exception(f"command '{statement.command}' not found")
+
+    try:
+      args = command.argparser.parse_args(statement.argv[1:])
+    except SystemExit:
+      # argparse already printed usage / help
+      return
+
+    self._submit_task(line.args, command.run, args)
+
+  # never return the task from do_*, cmd2 treats a truthy return as stop
+  def _submit_task(self, name, func, *args):
+    task = self.script.tasks.submit(name, func, *args)
+    self.scr.print(f"[blue][{task.id}][/blue] started: {task.name}")
+    return task
+
+  def do_jobs(self, line):
+    tasks = list(self.script.tasks.items())
+    if not tasks:
+      return self.scr.print("[italic]No jobs[/italic]")
+
+    if line.arg_list and line.arg_list[0] in ("-w", "--watch"):
+      from zzz.core.context.progress import watch_tasks
+      return watch_tasks(self.scr, self.script.tasks)
+
+    rows = [
+      (id, task.status, f"{task.elapsed:.1f}s", task.progress or "-", task.name)
+      for id, task in tasks
+    ]
+    self.scr.print_table(["ID", "Status", "Elapsed", "Progress", "Command"], rows, title="Jobs")
+
+  def do_wait(self, line):
+    task = self._get_task(line)
+    if task is None:
+      return
+    try:
+      task.future.exception()  # blocks until done
+    except KeyboardInterrupt:
+      return self.scr.print(f"\n[blue][{task.id}][/blue] still running")
+    except Exception:
+      pass
+    self._finish_task(task)
+
+  def do_fg(self, line):
+    task = self._get_task(line)
+    if task is None:
+      return
+
+    self.scr.sync()
+    task.output.attach(self.scr.file)
+    try:
+      task.future.exception()
+    except KeyboardInterrupt:
+      task.output.detach()
+      return self.scr.print(f"\n[blue][{task.id}][/blue] back in background")
+    except Exception:
+      pass
+    task.output.detach()
+    self._finish_task(task)
+
+  def do_cancel(self, line):
+    task = self._get_task(line)
+    if task is None:
+      return
+    if task.cancel():
+      self.scr.print(f"[blue][{task.id}][/blue] cancelled")
+    elif task.done:
+      self.scr.print(f"[blue][{task.id}][/blue] already {task.status}")
+    else:
+      # threads cannot be killed, the command has to check tasks.current().cancelled
+      self.scr.print(f"[blue][{task.id}][/blue] asked to stop")
+
+  # --- profiling
+  def help_profile(self):
+    self.scr.print(
+      "[red]Usage[/red]: profile [cpu|mem|all] <command> [ARGS]\n"
+      "       profile on [cpu|mem|all] | off\n\n"
+      "Profile a command with cProfile (cpu) and / or tracemalloc (mem), files go to ~/.zzz/profiles\n"
+    )
+
+  def complete_profile(self, text, line, begidx, endidx):
+    from zzz.core.profiler import PROFILE_MODES
+
+    words = ("on", "off") + PROFILE_MODES + tuple(name for name, _ in self.script.commands.items())
+    return [word for word in words if word.startswith(text)]
+
+  def do_profile(self, line):
+    from zzz.core.profiler import PROFILE_MODES
+
+    if not line:
+      state = f"on ({self.profile_mode})" if self.profile_mode else "off"
+      self.help_profile()
+      return self.scr.print(f"profiling: {state}")
+
+    first, _, rest = line.args.partition(" ")
+    if first == "off":
+      self.profile_mode = None
+      return self.scr.print("profiling: off")
+    if first == "on":
+      mode = rest.strip() or "cpu"
+      if mode not in PROFILE_MODES:
+        return self.exception(f"unknown profile mode '{mode}'")
+      self.profile_mode = mode
+      return self.scr.print(f"profiling: on ({mode})")
+
+    mode = "cpu"
+    if first in PROFILE_MODES:
+      mode, line = first, rest.strip()
+    else:
+      line = line.args
+    if not line:
+      return self.help_profile()
+
+    statement = self.statement_parser.parse(line)
+    command = self.script.commands.get(statement.command)
+    if command is None:
+      return self.exception(f"command '{statement.command}' not found")
+    try:
+      args = command.argparser.parse_args(statement.argv[1:])
+    except SystemExit:
+      return
+    self._profile(command, args, mode)
+
+  def _profile(self, command, args, mode):
+    from zzz.core.profiler import CommandProfiler
+
+    profiler = CommandProfiler(mode)
+    try:
+      profiler.run(command, args)
+    except Exception as e:
+      self.exception(e.args[0] if e.args else repr(e))
+    profiler.report(self.scr)
+
   #--- setting option
   @with_argparser(make_script_parser())
   def do_script(self, args):
@@ -113,32 +361,41 @@ class ZScriptRunner(Cmd):
       self.utils.print_options(False)
     elif args.subcommand == "options-required":
       self.utils.print_options(True)
+    elif args.subcommand == "cache":
+      self.utils.print_cache_stats()
+    elif args.subcommand == "cache-clear":
+      try:
+        self.script.caches.clear(args.name)
+      except KeyError as e:
+        return self.exception(e.args[0])
+      self.scr.print(f"[red]Cleared[/red]: {args.name or 'all caches'}\n")
 
   # ----------
   def help_zset(self):
     self.scr.print("[red]Usage[/red]: zset <name> <value>\n\nSET ZOption\n")
 
   def complete_zset(self, text, line, begidx, endidx):
-    tokens = line.split()
-
-    # Suggest option names when typing the option name
-    if len(tokens) <= 1 or (begidx <= len(tokens[0]) + 1):
-      return [name for name in self.script.options._options if name.startswith(text)]
+    # words before the one being completed: zset [name]
+    before = line[:begidx].split()
 
-    opt_name = tokens[1]
+    if len(before) <= 1:
+      return self._option_index.match(text)
+    if len(before) > 2:
+      return []
 
-    # If typing the value
-    if opt_name in self.script.options._options:
-      opt = self.script.options._options[opt_name]
+    opt = self.script.options._options.get(before[1])
+    if opt is None:
+      return []
 
-      # If the option has choices, show choices matching text
-      if opt.choices:
-        return [str(c) for c in opt.choices if str(c).startswith(text)]
+    # If the option has choices, show choices matching text
+    if opt.choices:
+      index = self._choice_indexes.get(before[1])
+      if index is None:
+        index = self._choice_indexes[before[1]] = PrefixIndex(opt.choices)
+      return index.match(text)
 
-      # Otherwise, use cmd2 built-in path completer
-      return self.path_complete(text, line, begidx, endidx)
-
-    return []
+    # Otherwise, use cmd2 built-in path completer
+    return self.path_complete(text, line, begidx, endidx)
 
   def do_zset(self, line):
     if not line:
@@ -159,13 +416,7 @@ class ZScriptRunner(Cmd):
   # ---
 
   def complete_help(self, text, line, begidx, endidx):
-    # Collect all commands (remove 'do_' prefix)
-    commands = [name[3:] for name in dir(self) if name.startswith('do_')]
-    # If no text typed yet, return all commands
-    if not text:
-      return commands
-    # Filter commands by what the user has typed so far
-    return [cmd for cmd in commands if cmd.startswith(text)]
+    return self._command_index.match(text)
 
   def do_help(self, line):
     if line:
@@ -186,7 +437,8 @@ class ZScriptRunner(Cmd):
 
     if intro:
       self.utils.print_intro()
-    
+
+    sync_manifest(self.script)
     self.cmdloop()
 
   def exception(self, text):
@@ -0,0 +1,182 @@
+import os
+import sys
+import signal
+import asyncio
+
+from os import getcwd
+from subprocess import PIPE, DEVNULL
+
+
+def _decode(data: bytes) -> str:
+  return data.decode("utf-8", errors="replace")
+
+def _kill(proc) -> None:
+  if proc.returncode is not None:
+    return
+  try:
+    if os.name == "posix":
+      # own session, kills the whole pipeline not just /bin/sh
+      os.killpg(proc.pid, signal.SIGKILL)
+    else:
+      proc.kill()
+  except (OSError, ProcessLookupError):
+    pass
+
+async def _readline(reader, limit: int) -> bytes:
+  try:
+    return await reader.readuntil(b"\n")
+  except asyncio.IncompleteReadError as e:
+    # eof, last line without newline (b"" when done)
+    return e.partial
+  except asyncio.LimitOverrunError as e:
+    # overlong line, hand it out in pieces
+    return await reader.read(e.consumed or limit)
+
+class AsyncProcess:
+  def __init__(self, proc, stdout: bytes = None, stderr: bytes = None):
+    self._process = proc
+    self._stdout = stdout
+    self._stderr = stderr
+
+  def output(self) -> str:
+    return _decode(self._stdout).strip() if self._stdout is not None else ""
+
+  def error(self) -> str:
+    return _decode(self._stderr).strip() if self._stderr is not None else ""
+
+  @property
+  def returncode(self) -> int:
+    return self._process.returncode
+
+class AsyncProcessBuilder:
+  """
+  asyncio counterpart of ProcessBuilder, a str runs through the shell,
+  a list / tuple is exec'd directly.
+  On timeout or cancellation the child (and its process group) is killed.
+
+    proc = await ash("uptime")
+    proc = await ash(["ping", "-c1", host], timeout=5).pipe()
+    async for name, line in ash("tail -f log").stream(): ...
+  """
+  # lines longer than this are split, keeps memory bounded
+  MAX_LINE = 1 << 20
+
+  def __init__(self, cmd, timeout: float = None) -> None:
+    self.cmd = cmd
+    self.stdin = DEVNULL
+    self.stdout = PIPE
+    self.stderr = PIPE
+    self.shell: bool = isinstance(cmd, str)
+    self.cwd: str = getcwd()
+    self.timeout = timeout
+    # set once a stream() finished
+    self.returncode = None
+
+  async def _spawn(self):
+    kwargs = dict(
+      cwd=self.cwd,
+      stdin=self.stdin,
+      stdout=self.stdout,
+      stderr=self.stderr,
+      limit=self.MAX_LINE,
+      start_new_session=os.name == "posix",
+    )
+    if self.shell:
+      return await asyncio.create_subprocess_shell(self.cmd, **kwargs)
+    return await asyncio.create_subprocess_exec(*self.cmd, **kwargs)
+
+  async def _guard(self, proc, awaitable):
+    # kill the child on timeout / cancel, then re-raise
+    try:
+      return await asyncio.wait_for(awaitable, self.timeout)
+    except BaseException:
+      _kill(proc)
+      await proc.wait()
+      raise
+
+  async def pipe(self) -> AsyncProcess:
+    self.stdout = PIPE
+    self.stderr = PIPE
+    proc = await self._spawn()
+    stdout, stderr = await self._guard(proc, proc.communicate())
+    return AsyncProcess(proc, stdout, stderr)
+
+  async def run(self) -> AsyncProcess:
+    self.stdin = sys.stdin
+    self.stdout = sys.stdout
+    self.stderr = sys.stderr
+    proc = await self._spawn()
+    await self._guard(proc, proc.wait())
+    return AsyncProcess(proc)
+
+  def __await__(self):
+    return self.pipe().__await__()
+
+  async def stream(self, chunk_size: int = 0, max_pending: int = 256):
+    """
+    Yields (name, data) while the process runs, data is a line without its
+    line ending or a bytes chunk if chunk_size is set. timeout covers the
+    whole stream.
+    """
+    self.stdout = PIPE
+    self.stderr = PIPE
+    proc = await self._spawn()
+    queue = asyncio.Queue(maxsize=max_pending)
+
+    async def read(name, reader):
+      try:
+        while True:
+          if chunk_size:
+            data = await reader.read(chunk_size)
+          else:
+            data = await _readline(reader, self.MAX_LINE)
+          if not data:
+            break
+          await queue.put((name, data if chunk_size else _decode(data).rstrip("\r\n")))
+      except (OSError, ValueError):
+        pass
+      # not in finally, a cancelled reader must not block on a full queue
+      await queue.put((name, None))
+
+    readers = [
+      asyncio.ensure_future(read("stdout", proc.stdout)),
+      asyncio.ensure_future(read("stderr", proc.stderr)),
+    ]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + self.timeout if self.timeout is not None else None
+    done = False
+    try:
+      open_readers = 2
+      while open_readers:
+        timeout = None if deadline is None else max(0, deadline - loop.time())
+        name, data = await asyncio.wait_for(queue.get(), timeout)
+        if data is None:
+          open_readers -= 1
+          continue
+        yield name, data
+      await asyncio.wait_for(proc.wait(), None if deadline is None else max(0, deadline - loop.time()))
+      done = True
+    finally:
+      if not done:
+        _kill(proc)
+      for reader in readers:
+        reader.cancel()
+      await asyncio.gather(*readers, return_exceptions=True)
+      await proc.wait()
+      self.returncode = proc.returncode
+
+  async def lines(self, on_stderr=None):
+    """stdout lines while the process runs"""
+    stream = self.stream()
+    try:
+      async for name, data in stream:
+        if name == "stdout":
+          yield data
+        elif on_stderr is not None:
+          on_stderr(data)
+    finally:
+      await stream.aclose()
+
+
+def ash(cmd, timeout: float = None) -> AsyncProcessBuilder:
+  return AsyncProcessBuilder(cmd, timeout)
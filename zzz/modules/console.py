@@ -3,6 +3,11 @@ import sys
 import time
 import atexit
 import select
+import threading
+import itertools
+
+from queue import Queue, Empty
+from contextlib import contextmanager
 
 from rich.text import Text
 from rich.panel import Panel
@@ -14,14 +19,212 @@ from rich.columns import Columns
 from typing import Literal
 
 
+class OutputSink:
+  """
+  Single writer thread for an AdvConsole: print() from any thread only
+  enqueues, the writer renders everything queued in one capture and writes
+  it at most every `interval` seconds or once `max_batch` prints are
+  waiting. Prints are never interleaved, and a bounded queue
+  (`max_pending`) slows producers down instead of growing without limit.
+  """
+  def __init__(self, console: 'AdvConsole', interval: float = 0.05, max_batch: int = 512, max_pending: int = 8192):
+    self.console = console
+    self.interval = interval
+    self.max_batch = max_batch
+
+    self._queue = Queue(max_pending)
+    self._thread = threading.Thread(target=self._run, name="zzz-console", daemon=True)
+    self._thread.start()
+
+  def put(self, items) -> None:
+    """items: list of (target, objects, kwargs), written together"""
+    self._queue.put(items)
+
+  def sync(self) -> None:
+    """Waits until everything queued so far is written"""
+    done = threading.Event()
+    self._queue.put(done)
+    done.wait()
+
+  def close(self) -> None:
+    self._queue.put(None)
+    self._thread.join()
+
+  def _run(self):
+    last_write = 0.0
+    stop = False
+    while not stop:
+      pending = [self._queue.get()]
+      # coalesce until the interval since the last write is over
+      deadline = last_write + self.interval
+      while len(pending) < self.max_batch and pending[-1] is not None:
+        try:
+          pending.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+        except Empty:
+          break
+
+      items, events = [], []
+      for entry in pending:
+        if entry is None:
+          stop = True
+        elif isinstance(entry, threading.Event):
+          events.append(entry)
+        else:
+          items.extend(entry)
+      try:
+        self.console._write_items(items)
+      except Exception as e:
+        sys.__stderr__.write(f"zzz: console writer: {e!r}\n")
+      last_write = time.monotonic()
+      for event in events:
+        event.set()
+
 class AdvConsole(Console):
   def __init__(self) -> None:
     super().__init__()
 
+    self._sink = None
+    # per thread list of pending prints inside batch()
+    self._batch = threading.local()
+    # set_output("json" / "jsonl" / "plain"), see zzz.modules.output
+    self.output_mode = None
+    self._structured = None
     atexit.register(self.__on_exit)
 
+  # ---- machine readable output
+
+  def set_output(self, mode: str = None) -> None:
+    """json / jsonl / plain: tables, lists, panels and results as records, None: rich"""
+    if mode in (None, "rich"):
+      self.output_mode = self._structured = None
+      return
+    from zzz.modules.output import StructuredOutput
+    self._structured = StructuredOutput(mode)
+    self.output_mode = mode
+
+  def _write_structured(self, kind: str, *args) -> None:
+    self.sync()
+    try:
+      getattr(self._structured, kind)(self._target(), *args)
+    except BrokenPipeError:
+      # reader went away (`| head`), same as rich
+      self.on_broken_pipe()
+
+  def _print_structured(self, objects) -> None:
+    from zzz.modules.output import renderable_to_data
+
+    if objects and all(isinstance(obj, str) for obj in objects):
+      objects = [" ".join(objects)]
+    for obj in objects:
+      kind, data = renderable_to_data(obj)
+      if kind == "table":
+        self._write_structured("table", *data)
+      elif data.strip():  # spacing (br, empty lines) is layout
+        self._write_structured("text", data)
+
+  def emit(self, value) -> None:
+    """
+    Shows data: serialized in an output mode, else as a table (list of
+    dicts, dict) / list (other sequences) / plain print. The runners emit
+    command return values with it in output modes.
+    """
+    if self._structured is not None:
+      return self._write_structured("value", value)
+
+    if isinstance(value, dict):
+      return self.print_table(["Key", "Value"], value.items())
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+      columns = list(dict.fromkeys(key for item in value for key in item))
+      return self.print_table(columns, ([item.get(col, "") for col in columns] for item in value))
+    if isinstance(value, (list, tuple, set, frozenset)):
+      return self.print_list(list(value), border=False)
+    self.print(value)
+
+  # ---- batched output
+
+  def _target(self):
+    # StreamRouter (background tasks) picks the stream by the calling
+    # thread, resolve it here, the write happens on another thread / later
+    file = self.file
+    return getattr(file, "target", file)
+
+  def print(self, *objects, **kwargs) -> None:
+    if self._structured is not None:
+      return self._print_structured(objects)
+    items = getattr(self._batch, "items", None)
+    if items is not None:
+      return items.append((self._target(), objects, kwargs))
+    if self._sink is not None:
+      return self._sink.put([(self._target(), objects, kwargs)])
+    return super().print(*objects, **kwargs)
+
+  def _write_items(self, items) -> None:
+    # one render + write per run of prints going to the same stream, plain
+    # string prints are merged into one Text (rich's layout per print call
+    # is most of the cost)
+    for target, group in itertools.groupby(items, key=lambda item: item[0]):
+      with self.capture() as capture:
+        texts = []
+        for _, objects, kwargs in group:
+          if not kwargs and all(isinstance(obj, str) for obj in objects):
+            texts.append(Text(" ").join(self.render_str(obj) for obj in objects))
+            continue
+          if texts:
+            Console.print(self, Text("\n").join(texts))
+            texts = []
+          Console.print(self, *objects, **kwargs)
+        if texts:
+          Console.print(self, Text("\n").join(texts))
+      target.write(capture.get())
+      target.flush()
+
+  @contextmanager
+  def batch(self):
+    """
+    Collects this thread's prints and writes them in one go on exit (kept
+    together even when other threads print meanwhile)
+
+      with script.scr.batch():
+        for item in items:
+          script.scr.print(item)
+    """
+    if getattr(self._batch, "items", None) is not None:
+      yield self  # nested, the outer batch writes
+      return
+
+    self._batch.items = []
+    try:
+      yield self
+    finally:
+      items, self._batch.items = self._batch.items, None
+      if items and self._sink is not None:
+        self._sink.put(items)
+      elif items:
+        self._write_items(items)
+
+  def start_sink(self, interval: float = 0.05, max_batch: int = 512, max_pending: int = 8192) -> 'AdvConsole':
+    """Moves rendering / writing to one writer thread, see OutputSink"""
+    if self._sink is None:
+      self._sink = OutputSink(self, interval, max_batch, max_pending)
+    return self
+
+  def stop_sink(self) -> None:
+    """Writes what is still queued and stops the writer thread"""
+    sink, self._sink = self._sink, None
+    if sink is not None:
+      sink.close()
+
+  def sync(self) -> None:
+    """Waits for queued output (no-op without a sink), before reading input or writing directly"""
+    if self._sink is not None:
+      self._sink.sync()
+
   # hide / show cursor
   def hide_cursor(self, hide: bool = True) -> None:
+    # no escapes into pipes / files (json output, benchmarks, ...)
+    if not sys.stdout.isatty():
+      return
+    self.sync()  # written directly, after anything still queued
     if hide:
       sys.stdout.write("\033[?25l")  # Hide cursor
     else:
@@ -46,6 +249,9 @@ class AdvConsole(Console):
     expand: bool = True,
     markup: bool = True
   ) -> None:
+    if self._structured is not None:
+      return self._write_structured("text", content, markup)
+
     # Add padding if requested
     if padding:
       content = f"\n{content}\n"
@@ -92,8 +298,11 @@ class AdvConsole(Console):
     style: str = "white",
     index_color: str = "cyan"
   ) -> None:
+    if self._structured is not None:
+      return self._write_structured("items", items)
+
     if not items:
-      raise Exception("Items list cannot be empty")
+      return self.print(f"[italic]{title + ': ' if title else ''}No items[/italic]")
 
     # Numbered items with style
     numbered_items = [
@@ -122,6 +331,9 @@ class AdvConsole(Console):
     border_style="blue",
     col_style="green"
   ):
+    if self._structured is not None:
+      return self._write_structured("table", columns, rows)
+
     table = Table(
       title=f"[bold magenta]{title}[/bold magenta]" if title else None,
       header_style=header_style,
@@ -138,6 +350,95 @@ class AdvConsole(Console):
   
     self.print(table)
 
+  # ---- iterators, page by page (see zzz.modules.pager)
+
+  def _can_page(self) -> bool:
+    return self.is_terminal and sys.stdin.isatty()
+
+  def _page_rows(self) -> int:
+    # title, borders, header, footer and the input line
+    return max(5, self.height - 8)
+
+  def stream_table(
+    self,
+    columns,
+    rows,
+    title=None,
+    page_size: int = None,
+    pager: bool = None,
+    sample: int = 200,
+    max_col_width: int = 60,
+    header_style="bold cyan",
+    border_style="blue",
+    col_style="green"
+  ) -> None:
+    """
+    print_table for any iterable of rows, in constant memory: column widths
+    are estimated from the first `sample` rows and kept for every page.
+    On a terminal rows are shown in an interactive pager (next / prev /
+    search), otherwise (or pager=False) streamed as aligned plain text.
+    """
+    if self._structured is not None:
+      return self._write_structured("table", columns, rows)
+
+    from zzz.modules import pager as paging
+
+    rows = iter(rows)
+    head = list(itertools.islice(rows, sample))
+    if not head:
+      return self.print(f"[italic]{title + ': ' if title else ''}No rows[/italic]")
+    widths = paging.estimate_widths(columns, head, max_col_width)
+    rows = itertools.chain(head, rows)
+
+    self.sync()
+    if not (self._can_page() if pager is None else pager):
+      file = self._target()
+      if title:
+        file.write(f"{title}\n")
+      paging.write_lines(file, paging.plain_table_lines(columns, rows, widths), page_size or 1000)
+      return
+
+    # borders and padding: 3 per column + 1
+    widths = paging.shrink_widths(widths, self.width - 3 * len(widths) - 1)
+    render = paging.table_renderer(columns, widths, title, header_style, border_style, col_style)
+    paging.Pager(self, paging.pages(rows, page_size or self._page_rows()), render).run()
+
+  def stream_list(
+    self,
+    items,
+    title: str | None = None,
+    page_size: int = None,
+    pager: bool = None,
+    sample: int = 200,
+    style: str = "white",
+    index_color: str = "cyan"
+  ) -> None:
+    """print_list for any iterable, paged on a terminal, streamed otherwise (see stream_table)"""
+    if self._structured is not None:
+      return self._write_structured("items", items)
+
+    from zzz.modules import pager as paging
+
+    items = iter(items)
+    head = list(itertools.islice(items, sample))
+    if not head:
+      return self.print(f"[italic]{title + ': ' if title else ''}No items[/italic]")
+    items = itertools.chain(head, items)
+
+    self.sync()
+    if not (self._can_page() if pager is None else pager):
+      file = self._target()
+      if title:
+        file.write(f"{title}\n")
+      paging.write_lines(file, paging.plain_list_lines(items), page_size or 1000)
+      return
+
+    size = page_size or self._page_rows()
+    # index column grows with the page count, leave room for 7 digits
+    width = min(max(len(paging.cell(item)) for item in head), self.width - 14)
+    render = paging.list_renderer(size, width, title, index_color, style)
+    paging.Pager(self, paging.pages(items, size), render).run()
+
   # True - completed, False - canceled
   def wait_basic(self, seconds: float = 5, message="(Ctrl + C to stop)") -> bool:
     """Waits with a countdown, allows interruption with Ctrl+C."""
@@ -157,22 +458,26 @@ class AdvConsole(Console):
   def wait(self, timeout: float = 5.0, message: str = "Time remaining") -> bool:
     try:
       self.hide_cursor()  # Hide
-      start_time = time.time()
+      start_time = time.monotonic()
+      shown = None
       while True:
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
+        if elapsed >= timeout:
+          return True
+
+        # redraw only when the number changes
         remaining = max(0, int(timeout - elapsed))
-        # print(f"{message} : {remaining}", end="\r", flush=True)
-        sys.stdout.write(f"\r{message} : {remaining}")
-        sys.stdout.flush()
-  
-        # Check for input every 0.1s
-        if sys.stdin in select.select([sys.stdin], [], [], 0.1)[0]:
+        if remaining != shown:
+          sys.stdout.write(f"\r{message} : {remaining}")
+          sys.stdout.flush()
+          shown = remaining
+
+        # sleep on stdin until the next second (or the end)
+        until_change = (timeout - elapsed) - remaining or 1.0
+        if sys.stdin in select.select([sys.stdin], [], [], until_change)[0]:
           line = sys.stdin.readline()
           print()  # Move to next line after user input
           return True if line == '\n' else False
-
-        if elapsed >= timeout:
-          return True
     except KeyboardInterrupt:
       return False
     finally:
@@ -182,6 +487,7 @@ class AdvConsole(Console):
 
   # clean up
   def __on_exit(self) -> None:
+    self.stop_sink()
     self.hide_cursor(False)
 
 def convert_markup_to_text(markup_text) -> str:
@@ -0,0 +1,138 @@
+import json
+import dataclasses
+
+from datetime import date, datetime
+from pathlib import PurePath
+
+
+# json: one JSON value per call (tables / lists as one array)
+# jsonl: tables / lists / returned sequences as one JSON value per row
+# plain: tab separated rows, one item per line, text without markup
+OUTPUT_MODES = ("json", "jsonl", "plain")
+
+def _default(value):
+  if hasattr(value, "model_dump"):  # pydantic
+    return value.model_dump(mode="json")
+  if dataclasses.is_dataclass(value) and not isinstance(value, type):
+    return dataclasses.asdict(value)
+  if isinstance(value, (set, frozenset)):
+    return list(value)
+  if isinstance(value, (datetime, date)):
+    return value.isoformat()
+  if isinstance(value, bytes):
+    return value.decode("utf-8", "replace")
+  if isinstance(value, PurePath):
+    return str(value)
+  return str(value)
+
+def dumps(value) -> str:
+  return json.dumps(value, default=_default, ensure_ascii=False)
+
+def strip_markup(text):
+  # only pay for the markup parser when there can be a tag
+  if isinstance(text, str) and "[" in text:
+    from rich.text import Text
+    return Text.from_markup(text).plain
+  return text
+
+def _plain_cell(value) -> str:
+  return "" if value is None else str(strip_markup(value)).replace("\t", " ").replace("\n", " ")
+
+def _is_records(value) -> bool:
+  return isinstance(value, (list, tuple)) and bool(value) and all(isinstance(item, dict) for item in value)
+
+def _is_sequence(value) -> bool:
+  return isinstance(value, (list, tuple, set, frozenset)) or (
+    hasattr(value, "__iter__") and hasattr(value, "__next__")  # generators
+  )
+
+class StructuredOutput:
+  """
+  Writes tables, lists, text and command results as records, straight to
+  a file: no markup parsing (unless a string has a tag), no layout, no
+  measuring. Used by AdvConsole when an output mode is set.
+  """
+  def __init__(self, mode: str):
+    if mode not in OUTPUT_MODES:
+      raise ValueError(f"unknown output mode '{mode}', use one of: {', '.join(OUTPUT_MODES)}")
+    self.mode = mode
+
+  def table(self, file, columns, rows) -> None:
+    columns = [str(strip_markup(col)) for col in columns]
+    if self.mode == "plain":
+      file.write("\t".join(columns) + "\n")
+      for row in rows:
+        file.write("\t".join(_plain_cell(value) for value in row) + "\n")
+    else:
+      self._records(file, ({col: strip_markup(value) for col, value in zip(columns, row)} for row in rows))
+    file.flush()
+
+  def items(self, file, items) -> None:
+    if self.mode == "plain":
+      for item in items:
+        file.write(_plain_cell(item) + "\n")
+    else:
+      self._records(file, (strip_markup(item) for item in items))
+    file.flush()
+
+  def text(self, file, text, markup: bool = True) -> None:
+    text = strip_markup(text) if markup else str(text)
+    file.write((text if self.mode == "plain" else dumps(text)) + "\n")
+    file.flush()
+
+  def value(self, file, value) -> None:
+    """A command's return value"""
+    if isinstance(value, dict) and self.mode == "plain":
+      for key, item in value.items():
+        file.write(f"{key}\t{_plain_cell(item)}\n")
+    elif _is_records(value):
+      columns = list(dict.fromkeys(key for record in value for key in record))
+      if self.mode == "plain":
+        self.table(file, columns, ([record.get(col) for col in columns] for record in value))
+      else:
+        self._records(file, value)
+    elif _is_sequence(value) and not isinstance(value, (str, bytes, dict)):
+      if self.mode == "plain":
+        self.items(file, value)
+      else:
+        self._records(file, value)
+    elif self.mode == "plain":
+      file.write(_plain_cell(value) + "\n")
+    else:
+      file.write(dumps(value) + "\n")
+    file.flush()
+
+  def _records(self, file, records) -> None:
+    # json: one array, written as the records come
+    if self.mode == "jsonl":
+      for record in records:
+        file.write(dumps(record) + "\n")
+      return
+
+    file.write("[")
+    for i, record in enumerate(records):
+      file.write(("," if i else "") + dumps(record))
+    file.write("]\n")
+
+def renderable_to_data(renderable):
+  """Best effort data of a rich renderable printed in an output mode: Table -> rows, anything else -> text"""
+  from rich.text import Text
+  from rich.table import Table
+
+  # Align / Panel / Padding wrap another renderable
+  while hasattr(renderable, "renderable") and not isinstance(renderable, Table):
+    renderable = renderable.renderable
+
+  if isinstance(renderable, Table):
+    columns = [str(col.header.plain if isinstance(col.header, Text) else col.header) for col in renderable.columns]
+    cells = [list(col.cells) for col in renderable.columns]
+    rows = [
+      [cell.plain if isinstance(cell, Text) else cell for cell in row]
+      for row in zip(*cells)
+    ]
+    return "table", (columns, rows)
+  if isinstance(renderable, Text):
+    return "text", renderable.plain
+  if isinstance(renderable, str):
+    return "text", renderable
+  return "text", str(renderable)
@@ -0,0 +1,181 @@
+import itertools
+
+from collections import deque
+
+from rich.text import Text
+from rich.table import Table
+from rich.console import Console
+
+
+# ---- fixed width layout, estimated from the first rows
+
+def cell(value) -> str:
+  return "" if value is None else str(value).replace("\n", " ")
+
+def fit(text: str, width: int) -> str:
+  return text if len(text) <= width else text[:max(0, width - 1)] + "…"
+
+def estimate_widths(columns, sample, max_width: int = 60):
+  """Column widths from the header and a sample of rows, capped at max_width"""
+  widths = [len(str(col)) for col in columns]
+  for row in sample:
+    for i, value in enumerate(row[:len(widths)]):
+      widths[i] = max(widths[i], len(cell(value)))
+  return [min(width, max_width) for width in widths]
+
+def shrink_widths(widths, total: int):
+  """Shrinks the widest columns until the sum fits into total"""
+  widths = list(widths)
+  while sum(widths) > total and max(widths) > 4:
+    widest = widths.index(max(widths))
+    widths[widest] -= 1
+  return widths
+
+def pages(iterable, size: int):
+  iterator = iter(iterable)
+  while True:
+    page = list(itertools.islice(iterator, size))
+    if not page:
+      return
+    yield page
+
+# ---- plain streaming (pipes, files, pager off)
+
+def plain_table_lines(columns, rows, widths):
+  yield "  ".join(fit(str(col), w).ljust(w) for col, w in zip(columns, widths)).rstrip()
+  yield "  ".join("-" * w for w in widths)
+  for row in rows:
+    yield "  ".join(fit(cell(value), w).ljust(w) for value, w in zip(row, widths)).rstrip()
+
+def plain_list_lines(items, start: int = 1):
+  for i, item in enumerate(items, start=start):
+    yield f"{i}. {cell(item)}"
+
+def write_lines(file, lines, chunk: int = 1000) -> int:
+  """Writes lines in chunks as they come, returns the number of lines"""
+  count = 0
+  for page in pages(lines, chunk):
+    file.write("\n".join(page) + "\n")
+    file.flush()
+    count += len(page)
+  return count
+
+# ---- interactive pager
+
+class Pager:
+  """
+  Pages through an iterator of pages: only the last `keep` pages are kept
+  for going back, everything else is pulled from the iterator on demand.
+
+    Enter / n   next page        p     previous page
+    /text       search forward   q     quit (also Ctrl+C / Ctrl+D)
+  """
+  HELP = "[dim]Enter/n next · p prev · /text search · q quit[/dim]"
+
+  def __init__(self, console, page_iter, render, keep: int = 64):
+    self.console = console
+    self.render = render  # (page, page index, search term) -> renderable
+    self._pages = page_iter
+    self._seen = deque(maxlen=keep)  # (page index, page)
+    self._count = 0                  # pages pulled so far
+    self._exhausted = False
+
+  def _page(self, index: int):
+    for i, page in self._seen:
+      if i == index:
+        return page
+    if index < self._count:
+      return None  # dropped from history
+    while self._count <= index:
+      page = next(self._pages, None)
+      if page is None:
+        self._exhausted = True
+        return None
+      self._seen.append((self._count, page))
+      self._count += 1
+    return page
+
+  def _search(self, start: int, term: str):
+    term = term.lower()
+    index = start
+    while True:
+      page = self._page(index)
+      if page is None:
+        return None
+      if any(term in " ".join(map(cell, row if isinstance(row, (list, tuple)) else (row,))).lower() for row in page):
+        return index
+      index += 1
+
+  def run(self) -> None:
+    index, term, note = 0, None, ""
+    page = self._page(0)
+    if page is None:
+      return
+    while True:
+      Console.clear(self.console)  # AdvConsole.clear forks `clear`
+      self.console.print(self.render(page, index, term))
+      last = self._exhausted and index == self._count - 1
+      self.console.print(f"page {index + 1}{' (last)' if last else ''}  {self.HELP} {note}")
+      note = ""
+      try:
+        answer = input(": ").strip()
+      except (EOFError, KeyboardInterrupt):
+        return self.console.print()
+
+      if answer in ("q", "quit"):
+        return
+      if answer.startswith("/"):
+        term = answer[1:] or term
+        found = self._search(index + 1, term) if term else None
+        if found is None:
+          note = f"[red]'{term}' not found[/red]"
+          continue
+        index = found
+      elif answer == "p":
+        if index == 0 or self._page(index - 1) is None:
+          note = "[red]no previous page[/red]"
+          continue
+        index -= 1
+      else:
+        if self._page(index + 1) is None:
+          if self._exhausted:
+            return
+          note = "[red]no next page[/red]"
+          continue
+        index += 1
+      page = self._page(index)
+
+def highlight(value, term) -> Text:
+  text = Text(cell(value))
+  if term:
+    text.highlight_words([term], style="reverse", case_sensitive=False)
+  return text
+
+def table_renderer(columns, widths, title=None, header_style="bold cyan", border_style="blue", col_style="green"):
+  def render(page, index, term):
+    table = Table(
+      title=f"[bold magenta]{title}[/bold magenta]" if title else None,
+      header_style=header_style,
+      border_style=border_style
+    )
+    for col, width in zip(columns, widths):
+      table.add_column(str(col), style=col_style, width=width, no_wrap=True, overflow="ellipsis")
+    for row in page:
+      table.add_row(*[highlight(value, term) for value in row])
+    return table
+  return render
+
+def list_renderer(page_size: int, width: int, title=None, index_color: str = "cyan", style: str = "white"):
+  def render(page, index, term):
+    table = Table(
+      title=f"[bold magenta]{title}[/bold magenta]" if title else None,
+      show_header=False,
+      border_style="blue"
+    )
+    table.add_column(style=f"bold {index_color}", justify="right")
+    table.add_column(style=f"bold {style}", width=width, no_wrap=True, overflow="ellipsis")
+    start = index * page_size + 1
+    for i, item in enumerate(page, start=start):
+      table.add_row(f"{i}.", highlight(item, term))
+    return table
+  return render
@@ -1,27 +1,166 @@
+import os
 import sys
+import time
+import signal
+import threading
 
 from os import getcwd
-from subprocess import Popen, PIPE
+from queue import Queue
+from collections import deque
+from subprocess import Popen, PIPE, DEVNULL, TimeoutExpired
 
 
+def _decode(data: bytes) -> str:
+  return data.decode("utf-8", errors="replace")
+
+def _kill_group(proc: Popen) -> None:
+  if proc.poll() is not None:
+    return
+  try:
+    if os.name == "posix":
+      os.killpg(proc.pid, signal.SIGKILL)
+    else:
+      proc.kill()
+  except OSError:
+    pass
+
 class Process:
-  def __init__(self, proc: Popen):
+  def __init__(self, proc: Popen, stdout: bytes = None, stderr: bytes = None):
     self._process = proc
-  
+    # captured output (pipe mode)
+    self._stdout = stdout
+    self._stderr = stderr
+
   def wait(self) -> 'Process':
     self._process.wait()
     return self
 
   def output(self) -> str:
+    if self._stdout is not None:
+      return _decode(self._stdout).strip()
     if self._process.stdout:
       output = self._process.stdout.read().decode("utf-8").strip()
       return output
     return ""
 
+  def error(self) -> str:
+    return _decode(self._stderr).strip() if self._stderr is not None else ""
+
+  @property
+  def stdout(self) -> bytes:
+    """Captured stdout bytes (pipe mode), None otherwise"""
+    return self._stdout
+
+  @property
+  def stderr(self) -> bytes:
+    """Captured stderr bytes (pipe mode), None otherwise"""
+    return self._stderr
+
   @property
   def returncode(self) -> int:
     return self._process.returncode
 
+class ProcessStream:
+  """
+  Output of a running process, read while it runs.
+
+  stdout and stderr are drained by one reader thread each into a bounded
+  queue, so they never deadlock each other and a slow consumer blocks the
+  readers (and so the child) instead of buffering output in memory.
+  Items are (name, data), name is "stdout" / "stderr", data is a line
+  without its line ending or a bytes chunk if chunk_size is set.
+  """
+  # lines longer than this are split, keeps memory bounded
+  MAX_LINE = 1 << 20
+
+  def __init__(self, proc: Popen, chunk_size: int = 0, max_pending: int = 256):
+    self._process = proc
+    self._chunk_size = chunk_size
+    self._queue = Queue(maxsize=max_pending)
+    self._open = 2  # readers not finished yet
+
+    for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr)):
+      threading.Thread(target=self._read, args=(name, pipe), daemon=True).start()
+
+  def _read(self, name, pipe):
+    try:
+      if self._chunk_size:
+        read = lambda: pipe.read1(self._chunk_size)
+      else:
+        read = lambda: pipe.readline(self.MAX_LINE)
+
+      for data in iter(read, b""):
+        if not self._chunk_size:
+          data = _decode(data).rstrip("\r\n")
+        self._queue.put((name, data))
+    except (OSError, ValueError):
+      # pipe closed under us by close()
+      pass
+    finally:
+      pipe.close()
+      self._queue.put((name, None))
+
+  def __iter__(self):
+    try:
+      while self._open:
+        name, data = self._queue.get()
+        if data is None:
+          self._open -= 1
+          continue
+        yield name, data
+      self._process.wait()
+    finally:
+      # consumer stopped early (break / exception)
+      if self._open:
+        self.close()
+
+  def select(self, name: str = "stdout", on_other=None):
+    """Items of one stream, items of the other go to on_other if given"""
+    items = self.__iter__()
+    try:
+      for src, data in items:
+        if src == name:
+          yield data
+        elif on_other is not None:
+          on_other(data)
+    finally:
+      items.close()
+
+  def each(self, on_stdout=None, on_stderr=None) -> int:
+    """Calls on_stdout / on_stderr per item until the process exits"""
+    callbacks = {"stdout": on_stdout, "stderr": on_stderr}
+    for name, data in self:
+      callback = callbacks[name]
+      if callback is not None:
+        callback(data)
+    return self.returncode
+
+  def wait(self) -> 'ProcessStream':
+    # drain (and drop) the rest
+    for _ in self:
+      pass
+    return self
+
+  def close(self) -> None:
+    """Kills the process (and its group) and releases the readers"""
+    _kill_group(self._process)
+
+    while self._open:
+      _, data = self._queue.get()
+      if data is None:
+        self._open -= 1
+    self._process.wait()
+
+  @property
+  def returncode(self) -> int:
+    return self._process.returncode
+
+  def __enter__(self) -> 'ProcessStream':
+    return self
+
+  def __exit__(self, *args) -> None:
+    self.close()
+
 class ProcessBuilder:
   def __init__(self, cmd: str) -> None:
     self.cmd: str = cmd
@@ -30,9 +169,24 @@ class ProcessBuilder:
     self.stderr = PIPE
     self.shell: bool = True
     self.cwd: str = getcwd()
+    self.timeout: float = None
 
   def pipe(self) -> Process:
-    return self._run()
+    # communicate reads both pipes while waiting, no deadlock on big output
+    if self.timeout is None:
+      proc = self._popen()
+      stdout, stderr = proc.communicate()
+      return Process(proc, stdout, stderr)
+
+    # own process group so a timeout kills the whole pipeline
+    proc = self._popen(start_new_session=os.name == "posix")
+    try:
+      stdout, stderr = proc.communicate(timeout=self.timeout)
+    except TimeoutExpired:
+      _kill_group(proc)
+      proc.communicate()
+      raise
+    return Process(proc, stdout, stderr)
 
   def run(self) -> Process:
     self.stdin = sys.stdin
@@ -40,17 +194,224 @@ class ProcessBuilder:
     self.stderr = sys.stderr
     return self._run()
 
-  def _run(self) -> Process:
-    proc = Popen(
+  def stream(self, chunk_size: int = 0, max_pending: int = 256) -> ProcessStream:
+    """Runs without waiting, output is read from the returned ProcessStream"""
+    self.stdin = DEVNULL
+    self.stdout = PIPE
+    self.stderr = PIPE
+    # own process group, closing the stream kills the whole pipeline
+    return ProcessStream(self._popen(start_new_session=os.name == "posix"), chunk_size, max_pending)
+
+  def lines(self, on_stderr=None):
+    """stdout lines while the process runs (started on the first next())"""
+    return self._stdout_items(0, on_stderr)
+
+  def chunks(self, size: int = 65536, on_stderr=None):
+    """stdout bytes chunks (at most size) while the process runs (started on the first next())"""
+    return self._stdout_items(size, on_stderr)
+
+  def _stdout_items(self, chunk_size: int, on_stderr):
+    # a generator: nothing runs until it is iterated, and closing it early
+    # (break, or dropping it unfinished) kills the process
+    stream = self.stream(chunk_size)
+    try:
+      yield from stream.select("stdout", on_stderr)
+    finally:
+      stream.close()
+
+  def each_line(self, on_stdout=None, on_stderr=None) -> ProcessStream:
+    stream = self.stream()
+    stream.each(on_stdout, on_stderr)
+    return stream
+
+  def _popen(self, **kwargs) -> Popen:
+    return Popen(
       self.cmd,
       cwd=self.cwd,
       shell=self.shell,
       stdin=self.stdin,
       stdout=self.stdout,
       stderr=self.stderr,
+      **kwargs
     )
-    return Process(proc).wait()
+
+  def _run(self) -> Process:
+    return Process(self._popen()).wait()
 
 
 def sh(cmd: str) -> ProcessBuilder:
   return ProcessBuilder(cmd)
+
+# ---- batches
+
+class ShResult:
+  """Outcome of one command of sh.map / sh.gather"""
+  def __init__(self, index: int, cmd: str):
+    self.index = index  # position in the input
+    self.cmd = cmd
+    self.returncode: int = None
+    self.stdout = b""
+    self.stderr = b""
+    self.elapsed: float = 0.0
+    # set if the command could not run or timed out
+    self.exception: Exception = None
+
+  @property
+  def ok(self) -> bool:
+    return self.exception is None and self.returncode == 0
+
+  def output(self) -> str:
+    return _decode(self.stdout).strip()
+
+  def error(self) -> str:
+    return _decode(self.stderr).strip()
+
+  def __repr__(self):
+    return f"<ShResult #{self.index} rc={self.returncode} {self.elapsed:.3f}s {self.cmd!r}>"
+
+def _format_cmd(template: str, item) -> str:
+  if isinstance(item, dict):
+    return template.format(**item)
+  if isinstance(item, (tuple, list)):
+    return template.format(*item)
+  return template.format(item)
+
+def _format_cmds(template: str, inputs):
+  """(command, None) per item, (template, exception) when the item does not fit the template"""
+  for item in inputs:
+    try:
+      yield _format_cmd(template, item), None
+    except Exception as e:
+      # missing key / index, bad format spec, ...
+      yield template, e
+
+class _Running:
+  """Processes of a sh.map batch, killed (with their groups) when the consumer stops early"""
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._procs = set()
+    self.stopped = False
+
+  def add(self, proc: Popen) -> bool:
+    """False if the batch was stopped meanwhile, the caller kills proc"""
+    with self._lock:
+      if self.stopped:
+        return False
+      self._procs.add(proc)
+      return True
+
+  def discard(self, proc: Popen) -> None:
+    with self._lock:
+      self._procs.discard(proc)
+
+  def stop(self) -> None:
+    with self._lock:
+      self.stopped = True
+      procs, self._procs = list(self._procs), set()
+    for proc in procs:
+      _kill_group(proc)
+
+def _run_one(index: int, cmd: str, timeout: float, cwd: str, running: _Running) -> ShResult:
+  result = ShResult(index, cmd)
+  builder = ProcessBuilder(cmd)
+  if cwd is not None:
+    builder.cwd = cwd
+
+  start = time.perf_counter()
+  try:
+    # own process group: a timeout or a stopped batch kills the whole pipeline
+    proc = builder._popen(start_new_session=os.name == "posix")
+    if not running.add(proc):
+      _kill_group(proc)
+    try:
+      result.stdout, result.stderr = proc.communicate(timeout=timeout)
+    except TimeoutExpired as e:
+      _kill_group(proc)
+      proc.communicate()
+      result.exception = e
+      result.stdout, result.stderr = e.stdout or b"", e.stderr or b""
+    finally:
+      running.discard(proc)
+    result.returncode = proc.returncode
+  except Exception as e:
+    result.exception = e
+  result.elapsed = time.perf_counter() - start
+  return result
+
+def sh_map(cmds, inputs=None, workers: int = 8, ordered: bool = True, timeout: float = None, cwd: str = None):
+  """
+  Runs many commands with at most workers at a time, yields ShResult
+  in input order (ordered=True) or as they complete.
+  cmds is an iterable of command strings, or a template formatted with
+  each item of inputs (dict -> keywords, tuple -> positional):
+
+    for res in sh.map("ping -c1 {}", hosts, workers=32): ...
+    results = sh.gather(["uptime", "df -h"], timeout=10)
+
+  Failures never raise, see ShResult.ok / .exception (an item that does
+  not fit the template is a failed result with the formatting error).
+  """
+  from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+  if inputs is not None:
+    commands = _format_cmds(cmds, inputs)
+  elif isinstance(cmds, str):
+    commands = iter([(cmds, None)])
+  else:
+    commands = ((cmd, None) for cmd in cmds)
+
+  workers = max(1, workers)
+  # only a window of commands is in flight, inputs can be huge / lazy
+  window = workers * 2
+
+  running = _Running()
+  pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zzz-sh")
+
+  def submit(index, command):
+    cmd, error = command
+    if error is None:
+      return pool.submit(_run_one, index, cmd, timeout, cwd, running)
+    result = ShResult(index, cmd)
+    result.exception = error
+    future = Future()
+    future.set_result(result)
+    return future
+
+  pending = deque() if ordered else set()
+  commands = enumerate(commands)
+
+  def fill():
+    while len(pending) < window:
+      item = next(commands, None)
+      if item is None:
+        return
+      future = submit(*item)
+      pending.append(future) if ordered else pending.add(future)
+
+  try:
+    fill()
+    while pending:
+      if ordered:
+        yield pending.popleft().result()
+      else:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+          pending.discard(future)
+          yield future.result()
+      fill()
+  except BaseException:
+    # consumer stopped early (break -> GeneratorExit, Ctrl+C): do not wait
+    # for the commands in flight, with timeout=None that could be forever
+    for future in pending:
+      future.cancel()
+    running.stop()
+    pool.shutdown(wait=False)
+    raise
+  pool.shutdown()
+
+def sh_gather(cmds, inputs=None, workers: int = 8, timeout: float = None, cwd: str = None) -> list:
+  """sh.map collected into a list, in input order"""
+  return list(sh_map(cmds, inputs, workers=workers, ordered=True, timeout=timeout, cwd=cwd))
+
+sh.map = sh_map
+sh.gather = sh_gather
@@ -0,0 +1,149 @@
+import os
+import time
+import shutil
+import signal
+import threading
+
+from os import getcwd
+from uuid import uuid4
+from queue import Queue, Empty
+from subprocess import Popen, PIPE, TimeoutExpired
+
+from .process import ShResult
+
+
+def _quote(cmd: str) -> str:
+  return "'" + cmd.replace("'", "'\\''") + "'"
+
+class ShellSession:
+  """
+  Long-lived shell coprocess, commands are written to its stdin and their
+  output framed by a sentinel line carrying the exit code. No fork / shell
+  startup per call, and cd / export carry over between calls.
+
+    session = ShellSession()
+    session.run("cd /var/log")
+    session.run("ls | wc -l").output()
+
+  Commands get /dev/null as stdin. bash is used when available (a syntax
+  error under dash kills the shell); if the shell exits (`exit`, crash,
+  timeout) it is restarted with fresh state on the next call.
+  """
+  def __init__(self, shell: str = None, cwd: str = None, env: dict = None):
+    self.shell = shell or shutil.which("bash") or "/bin/sh"
+    self.cwd = cwd or getcwd()
+    self.env = env
+    self.calls = 0
+
+    self._proc: Popen = None
+    self._stdout: Queue = None
+    self._stderr: Queue = None
+    self._sentinel = f"__zzz_{uuid4().hex}__".encode()
+    self._lock = threading.Lock()
+
+  @property
+  def alive(self) -> bool:
+    return self._proc is not None and self._proc.poll() is None
+
+  def start(self) -> 'ShellSession':
+    if self.alive:
+      return self
+
+    self._proc = Popen(
+      [self.shell],
+      cwd=self.cwd,
+      env=self.env,
+      stdin=PIPE,
+      stdout=PIPE,
+      stderr=PIPE,
+      start_new_session=os.name == "posix",
+    )
+    self._stdout, self._stderr = Queue(), Queue()
+    for pipe, queue in ((self._proc.stdout, self._stdout), (self._proc.stderr, self._stderr)):
+      threading.Thread(target=self._read, args=(pipe, queue), daemon=True).start()
+    return self
+
+  @staticmethod
+  def _read(pipe, queue):
+    try:
+      for line in iter(pipe.readline, b""):
+        queue.put(line)
+    except (OSError, ValueError):
+      pass
+    finally:
+      queue.put(None)  # eof, shell is gone
+
+  def _collect(self, queue, deadline):
+    """Lines up to the sentinel -> (output, exit code or None if the shell died)"""
+    lines = []
+    while True:
+      timeout = None if deadline is None else max(0, deadline - time.monotonic())
+      try:
+        line = queue.get(timeout=timeout)
+      except Empty:
+        raise TimeoutError
+      if line is None:
+        return b"".join(lines), None
+      if line.startswith(self._sentinel):
+        # the framing added one newline in front of the sentinel
+        output = b"".join(lines)
+        return output[:-1] if output.endswith(b"\n") else output, line[len(self._sentinel):].strip()
+      lines.append(line)
+
+  def run(self, cmd: str, timeout: float = None) -> ShResult:
+    with self._lock:
+      self.start()
+      result = ShResult(self.calls, cmd)
+      self.calls += 1
+
+      sentinel = self._sentinel.decode()
+      script = (
+        f"eval {_quote(cmd)} </dev/null\n"
+        f"printf '\\n%s %d\\n' {sentinel} $?\n"
+        f"printf '\\n%s\\n' {sentinel} >&2\n"
+      )
+
+      start = time.perf_counter()
+      deadline = None if timeout is None else time.monotonic() + timeout
+      try:
+        self._proc.stdin.write(script.encode())
+        self._proc.stdin.flush()
+        result.stdout, code = self._collect(self._stdout, deadline)
+        result.stderr, _ = self._collect(self._stderr, deadline)
+      except TimeoutError:
+        self.close()
+        result.exception = TimeoutExpired(cmd, timeout)
+        result.elapsed = time.perf_counter() - start
+        return result
+      except (BrokenPipeError, OSError) as e:
+        self.close()
+        result.exception = e
+        result.elapsed = time.perf_counter() - start
+        return result
+
+      if code is None:
+        # shell exited during the command, report its exit status
+        result.returncode = self._proc.wait()
+        self.close()
+      else:
+        result.returncode = int(code)
+      result.elapsed = time.perf_counter() - start
+      return result
+
+  def close(self) -> None:
+    proc, self._proc = self._proc, None
+    if proc is None:
+      return
+    if proc.poll() is None:
+      try:
+        proc.stdin.close()
+        os.killpg(proc.pid, signal.SIGKILL) if os.name == "posix" else proc.kill()
+      except OSError:
+        pass
+    proc.wait()
+
+  def __enter__(self) -> 'ShellSession':
+    return self.start()
+
+  def __exit__(self, *args) -> None:
+    self.close()
@@ -1 +1 @@
-from .path import ensure_dir
\ No newline at end of file
+from .path import ensure_dir, zzz_home
\ No newline at end of file
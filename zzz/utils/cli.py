@@ -1,9 +1,14 @@
 import sys
 
-from typing import Optional
+from typing import Iterator, Optional
 
 def read_from_stdin() -> Optional[str]:
   if sys.stdin.isatty():  # True if running in terminal, no pipe
       return None
   return sys.stdin.read()
 
+# line by line, never the whole input in memory
+def iter_stdin() -> Optional[Iterator[str]]:
+  if sys.stdin.isatty():
+    return None
+  return iter(sys.stdin.readline, "")
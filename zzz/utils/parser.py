@@ -1,18 +1,72 @@
+import gc
+import os
 import json
+import pickle
+import hashlib
+
 from pathlib import Path
-from typing import IO, Any, Optional, Type, Union
+from contextlib import contextmanager
+from typing import IO, Any, Iterator, Optional, Type, Union
 from pydantic import BaseModel, ValidationError
 
+from .path import zzz_home
+
+# parse type by file suffix, anything else is json
+PARSE_TYPES = {".json": "json", ".toml": "toml", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# bump when the cache entry layout changes
+CACHE_VERSION = 1
+
+def detect_parse_type(path: Union[str, Path]) -> str:
+  return PARSE_TYPES.get(Path(path).suffix.lower(), "json")
+
+def _load_toml(file: IO) -> Any:
+  try:
+    import tomllib
+  except ImportError:  # python < 3.11
+    try:
+      import tomli as tomllib
+    except ImportError:
+      raise Exception("TOML needs python 3.11+ (tomllib) or the tomli package")
+  # tomllib wants bytes
+  data = file.read()
+  return tomllib.loads(data.decode() if isinstance(data, bytes) else data)
+
+def iter_jsonl(file: IO, model: Optional[Type[BaseModel]] = None) -> Iterator[Any]:
+  """Records of a JSON Lines file one by one (validated against model), never the whole file in memory"""
+  for lineno, line in enumerate(file, start=1):
+    if isinstance(line, bytes):
+      line = line.decode()
+    if not line.strip():
+      continue
+    try:
+      record = json.loads(line)
+    except json.JSONDecodeError as e:
+      raise Exception(f"Invalid JSON on line {lineno}: {e}")
+    if model is None:
+      yield record
+      continue
+    try:
+      yield model.model_validate(record)
+    except ValidationError:
+      raise Exception(f"Invalid structure for model {model.__name__} on line {lineno}")
+
 def parse_file(
   file: IO | dict,
   model: Optional[Type[BaseModel]] = None,
   parse_type: str = "json"
 ) -> Any:
+  if parse_type == "jsonl":
+    # the model applies per record
+    return list(iter_jsonl(file, model))
+
   try:
     if parse_type == "dict":
       data = file
     elif parse_type == "json":
       data = json.load(file)
+    elif parse_type == "toml":
+      data = _load_toml(file)
     else:
       raise Exception(f"Unsupported parse type: {parse_type}")
   except Exception as e:
@@ -20,25 +74,118 @@ def parse_file(
 
   if model is None:
     return data
+  return _validate(model, data)
 
+def _validate(model: Type[BaseModel], data) -> Any:
   try:
     return model.model_validate(data)
   except ValidationError:
     raise Exception(f"Invalid structure for model {model.__name__}")
 
+# ---- cache of parsed documents
+
+@contextmanager
+def _gc_paused():
+  # building big object graphs (parse / validate) triggers a full gc scan
+  # every few thousand objects, for nothing: configs have no cycles
+  enabled = gc.isenabled()
+  gc.disable()
+  try:
+    yield
+  finally:
+    if enabled:
+      gc.enable()
+
+def config_cache_dir() -> Path:
+  path = zzz_home() / "cache" / "config"
+  path.mkdir(parents=True, exist_ok=True, mode=0o700)
+  return path
+
+def _cache_file(path: Path) -> Path:
+  return config_cache_dir() / f"{hashlib.sha1(str(path).encode()).hexdigest()[:16]}.pickle"
+
+def _cache_key(path: Path, stat, parse_type: str) -> tuple:
+  return (CACHE_VERSION, str(path), stat.st_size, stat.st_mtime_ns, parse_type)
+
+def _cache_load(cache_file: Path, key: tuple):
+  try:
+    with open(cache_file, "rb") as file:
+      cached_key, value = pickle.load(file)
+  except Exception:
+    # missing or truncated
+    return None, False
+  return (value, True) if cached_key == key else (None, False)
+
+def _cache_store(cache_file: Path, key: tuple, value) -> None:
+  tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+  try:
+    with open(tmp, "wb") as file:
+      pickle.dump((key, value), file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cache_file)
+  except Exception:
+    # no space / not writable: just not cached
+    try:
+      os.unlink(tmp)
+    except OSError:
+      pass
+
+def _load_document(path: Path, parse_type: str, cache: bool):
+  if not cache:
+    with open(path, "rb" if parse_type == "toml" else "r") as file:
+      return parse_file(file, None, parse_type)
+
+  stat = os.stat(path)
+  key = _cache_key(path, stat, parse_type)
+  cache_file = _cache_file(path)
+  data, hit = _cache_load(cache_file, key)
+  if hit:
+    return data
+
+  with open(path, "rb" if parse_type == "toml" else "r") as file:
+    data = parse_file(file, None, parse_type)
+  # written while we parsed: do not cache it under the old mtime
+  if os.stat(path).st_mtime_ns == stat.st_mtime_ns:
+    _cache_store(cache_file, key, data)
+  return data
+
 def parse_config(
   file_path: Union[str, Path, dict],
   model: Optional[Type[BaseModel]] = None,
-  parse_type: str = "json"
+  parse_type: Optional[str] = None,
+  cache: bool = True
 ) -> Any:
+  """
+  Loads a json / toml / jsonl config (parse_type None: by suffix) and
+  validates it against model.
+
+  The parsed document is cached in ~/.zzz/cache/config keyed by path,
+  size and mtime, a changed file is parsed again. Validation always runs
+  (pydantic-core re-validates plain data faster than validated models
+  unpickle, and model changes can never see a stale result), with the gc
+  paused.
+  """
   try:
     if isinstance(file_path, dict):
       return parse_file(file_path, model, "dict")
-    with open(file_path, "r") as file:
-      return parse_file(file, model, parse_type)
+
+    path = Path(file_path).resolve()
+    parse_type = parse_type or detect_parse_type(path)
+    with _gc_paused():
+      data = _load_document(path, parse_type, cache)
+      if model is None:
+        return data
+      if parse_type == "jsonl":
+        return [_validate(model, record) for record in data]
+      return _validate(model, data)
   except FileNotFoundError:
     raise FileNotFoundError(f"Config file not found: {file_path}")
-  except json.JSONDecodeError:
-    raise json.JSONDecodeError(f"Invalid JSON format: {file_path}")
   except Exception as e:
     raise Exception(f"Unexpected error parsing {file_path}: {e}")
+
+def iter_config(
+  file_path: Union[str, Path],
+  model: Optional[Type[BaseModel]] = None
+) -> Iterator[Any]:
+  """Streams the records of a JSON Lines config (not cached, nothing is kept)"""
+  with open(file_path, "r") as file:
+    yield from iter_jsonl(file, model)
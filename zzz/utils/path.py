@@ -1,3 +1,5 @@
+import os
+
 from pathlib import Path
 
 from typing import Union
@@ -5,3 +7,7 @@ from typing import Union
 def ensure_dir(path: Union[Path, str]) -> Path:
   Path(path).mkdir(parents=True, exist_ok=True)
   return path
+
+# zzz data dir, ZZZ_HOME overrides ~/.zzz
+def zzz_home() -> Path:
+  return Path(os.environ.get("ZZZ_HOME") or Path.home() / ".zzz")